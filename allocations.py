@@ -0,0 +1,197 @@
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+# Call sites are reported for these files only
+GAME_FILES = ('sprite.py', 'camera.py', 'level.py', 'player.py', 'main.py')
+
+
+class NullAllocationTracker:
+    " Stand-in for AllocationTracker when the diagnostics are off: does nothing."
+
+    def begin_frame(self) -> None:
+        pass
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class AllocationTracker:
+    """
+    A class to represent the per frame allocation diagnostics (tracemalloc).
+
+    One frame every `interval` is measured: traces are cleared when it begins,
+    the snapshot taken when it ends gives the blocks allocated during the
+    frame and still alive at its end, per call site of the game files.
+    Inside the frame, a snapshot is taken at each phase mark (the profiler
+    phases, see Game._mark): its difference with the previous one gives,
+    per phase and call site, the blocks allocated and still alive at the
+    phase end, and the traced memory peak gives the phase transient peak.
+    Limitation: blocks allocated and freed within a single phase (temporary
+    lists, vectors...) are not attributed to a call site, they only show
+    in that phase peak.
+    The next measured frame begins with a snapshot of the blocks allocated
+    since the previous one and still alive: the retained memory per site.
+    Steady growth is detected on the number of allocated Python blocks.
+    """
+
+    def __init__(self, interval: int = 600, files: tuple = GAME_FILES,
+                 growth_samples: int = 10, growth_blocks: int = 1000, verbose: bool = True):
+        """
+        :param interval int: frames between two measured frames.
+        :param growth_samples int: measured frames considered for growth.
+        :param growth_blocks int: growth (blocks) over those samples to report.
+        :param verbose bool: print a line per measured frame.
+        """
+        self.interval = interval
+        self.growth_samples = growth_samples
+        self.growth_blocks = growth_blocks
+        self.verbose = verbose
+        self.filters = [tracemalloc.Filter(True, '*' + name) for name in files]
+        self.frames = 0
+        self.per_frame = {}  # site -> [blocks, bytes] summed over measured frames
+        self.retained = {}  # site -> (blocks, bytes) in the last window
+        self.phases = {}  # phase -> [blocks, bytes, peak] summed over measured frames
+        self.phase_sites = {}  # (phase, site) -> [blocks, bytes] summed
+        self.peaks = []  # largest phase peak of measured frames (bytes)
+        self.blocks = []  # (frame, sys.getallocatedblocks())
+        self.__measuring = False
+        self.__snapshot = None  # at the previous mark
+        self.__base = 0  # traced memory at the previous mark (bytes)
+        self.__peak = 0  # largest phase peak of the current frame (bytes)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        " Current traces of the game files."
+        return tracemalloc.take_snapshot().filter_traces(self.filters)
+
+    def _statistics(self) -> list:
+        " Game files call sites of the current traces."
+        return self._snapshot().statistics('lineno')
+
+    @staticmethod
+    def _site(statistic) -> str:
+        frame = statistic.traceback[0]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+    def begin_frame(self) -> None:
+        " Should be called before each frame."
+        self.frames += 1
+        if self.frames % self.interval:
+            return
+        if self.blocks:  # (nothing traced before the first measured frame)
+            self.retained = {self._site(s): (s.count, s.size) for s in self._statistics()}
+        self.blocks.append((self.frames, sys.getallocatedblocks()))
+        self.__snapshot = None
+        self.__peak = 0
+        tracemalloc.clear_traces()
+        self.__base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.__measuring = True
+
+    def mark(self, phase: str) -> None:
+        """ Ends a phase of a measured frame (see profiler.PHASES).
+        :param phase str: phase name.
+        """
+        if not self.__measuring:
+            return
+        # (peak above the memory traced when the phase began)
+        peak = tracemalloc.get_traced_memory()[1] - self.__base
+        snapshot = self._snapshot()
+        if self.__snapshot is None:
+            statistics = [(s.count, s.size, s) for s in snapshot.statistics('lineno')]
+        else:
+            statistics = [(s.count_diff, s.size_diff, s)
+                          for s in snapshot.compare_to(self.__snapshot, 'lineno')]
+        totals = self.phases.setdefault(phase, [0, 0, 0])
+        for count, size, statistic in statistics:
+            if count or size:
+                site = self.phase_sites.setdefault((phase, self._site(statistic)), [0, 0])
+                site[0] += count
+                site[1] += size
+                totals[0] += count
+                totals[1] += size
+        totals[2] += peak
+        self.__peak = max(self.__peak, peak)
+        self.__snapshot = snapshot
+        # (the snapshots are traced too: next phase is measured from here)
+        self.__base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def end_frame(self) -> None:
+        " Should be called after each frame."
+        if not self.__measuring:
+            return
+        self.mark('other')  # (after the last phase mark)
+        self.__measuring = False
+        self.__snapshot = None
+        self.peaks.append(self.__peak)
+        statistics = self._statistics()
+        for statistic in statistics:
+            site = self.per_frame.setdefault(self._site(statistic), [0, 0])
+            site[0] += statistic.count
+            site[1] += statistic.size
+        if self.verbose:
+            blocks = sum(s.count for s in statistics)
+            size = sum(s.size for s in statistics)
+            retained = sum(size for _, size in self.retained.values())
+            growth = self.growth()
+            print(f"[alloc] frame {self.frames}: {blocks} blocks / {size / 1024:.1f} KB "
+                  f"alive at frame end, peak {self.peaks[-1] / 1024:.1f} KB, "
+                  f"retained {retained / 1024:.1f} KB since last, "
+                  f"{self.blocks[-1][1]} Python blocks"
+                  + (f"  GROWING +{growth:.1f} blocks/frame" if growth else ""))
+
+    def growth(self) -> float:
+        """ Steady growth of the allocated blocks over the last samples.
+        :return float: growth in blocks per frame, 0 if not steady.
+        """
+        if len(self.blocks) < self.growth_samples:
+            return 0.
+        frames, blocks = np.array(self.blocks[-self.growth_samples:], float).T
+        increasing = np.count_nonzero(np.diff(blocks) > 0) / (len(blocks) - 1)
+        slope = np.polyfit(frames, blocks, 1)[0]
+        if increasing < .8 or slope * (frames[-1] - frames[0]) < self.growth_blocks:
+            return 0.
+        return slope
+
+    def report(self, top: int = 10) -> str:
+        " Per site allocations per measured frame, retained memory and growth."
+        measured = max(len(self.peaks), 1)
+        lines = [f"Allocations: {len(self.peaks)} measured frames (1 every {self.interval}), "
+                 f"mean peak {np.mean(self.peaks or [0]) / 1024:.1f} KB per frame",
+                 "  per phase (alive at phase end; peak includes the blocks freed",
+                 "  within the phase, which are not attributed to a call site):"]
+        for phase, (blocks, size, peak) in self.phases.items():
+            lines.append(f"    {phase:<24}{blocks / measured:>8.1f} blocks {size / measured:>10.0f} B"
+                         f"  peak {peak / measured:>8.0f} B")
+            sites = sorted(((site, values) for (name, site), values in self.phase_sites.items()
+                            if name == phase), key=lambda item: -abs(item[1][1]))
+            lines += [f"      {site:<22}{blocks / measured:>8.1f} blocks {size / measured:>10.0f} B"
+                      for site, (blocks, size) in sites[:3]]
+        lines.append("  per frame (alive at frame end):")
+        sites = sorted(self.per_frame.items(), key=lambda item: -item[1][1])
+        lines += [f"    {site:<24}{blocks / measured:>8.1f} blocks {size / measured:>10.0f} B"
+                  for site, (blocks, size) in sites[:top]]
+        lines.append(f"  retained over the last {self.interval} frames:")
+        sites = sorted(self.retained.items(), key=lambda item: -item[1][1])
+        lines += [f"    {site:<24}{blocks:>8} blocks {size:>10} B"
+                  for site, (blocks, size) in sites[:top]]
+        growth = self.growth()
+        lines.append(f"  steady growth: {growth:.2f} blocks/frame" if growth
+                     else "  no steady growth")
+        return "\n".join(lines)
+
+    def stop(self) -> None:
+        " Prints the report and stops tracing."
+        print(self.report())
+        tracemalloc.stop()
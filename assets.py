@@ -0,0 +1,125 @@
+import json
+import mmap
+import os
+
+import pygame
+
+MAGIC = b'DJASSET1'
+ALIGN = 64  # blobs start on 64 bytes boundaries
+
+
+def _source_stamp(path: str) -> list:
+    " Size and modification time of a source file (bundle staleness)."
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _index(images: dict, sounds: dict) -> dict:
+    " What a bundle of these assets must contain (compared on load)."
+    return {
+        'images': {name: [path, size and list(size), mirrored, _source_stamp(path)]
+                   for name, (path, size, mirrored) in images.items()},
+        'sounds': {name: [path, _source_stamp(path)] for name, path in sounds.items()},
+        'mixer': list(pygame.mixer.get_init() or ()),
+    }
+
+
+def bake(path: str, images: dict, sounds: dict) -> None:
+    """ Decodes, scales and packs the assets in a bundle file.
+    :param images dict: name -> (file, size to scale to or None, mirrored).
+    :param sounds dict: name -> file (decoded to the current mixer format).
+    """
+    index = _index(images, sounds)
+    blobs = []
+    entries = {}
+    for name, (source, size, mirrored) in images.items():
+        image = pygame.image.load(source)
+        if size:
+            image = pygame.transform.scale(image, size)
+        if mirrored:
+            image = pygame.transform.flip(image, True, False)
+        alpha = bool(image.get_flags() & pygame.SRCALPHA) or image.get_colorkey() is not None
+        blobs.append(pygame.image.tobytes(image, 'RGBA'))
+        entries[name] = {'type': 'image', 'size': image.get_size(), 'alpha': alpha}
+    for name, source in sounds.items():
+        blobs.append(pygame.mixer.Sound(source).get_raw())
+        entries[name] = {'type': 'sound'}
+
+    header = len(MAGIC) + 4
+    offset = 0
+    layout = []
+    for name, blob in zip(entries, blobs):
+        entries[name]['length'] = len(blob)
+        layout.append(offset)
+        offset += -len(blob) % ALIGN + len(blob)
+    # blob offsets are relative to the (aligned) end of the index
+    for name, start in zip(entries, layout):
+        entries[name]['offset'] = start
+    index['entries'] = entries
+    encoded = json.dumps(index).encode()
+    data_start = header + len(encoded) + (-(header + len(encoded)) % ALIGN)
+
+    with open(path, 'wb') as file:
+        file.write(MAGIC + len(encoded).to_bytes(4, 'little') + encoded)
+        file.write(b'\0' * (data_start - file.tell()))
+        for blob in blobs:
+            file.write(blob)
+            file.write(b'\0' * (-len(blob) % ALIGN))
+
+
+def _read_index(path: str):
+    " Bundle index and data offset, None if not a (readable) bundle."
+    try:
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                return None
+            length = int.from_bytes(file.read(4), 'little')
+            index = json.loads(file.read(length))
+    except (OSError, ValueError):
+        return None
+    header = len(MAGIC) + 4 + length
+    return index, header + (-header % ALIGN)
+
+
+def load_assets(path: str, images: dict, sounds: dict) -> dict:
+    """ Maps the asset bundle and builds Surfaces (display format) and Sounds
+    from it: no decoding, no scaling. The bundle is baked first if missing or
+    out of date (sources, sizes or mixer format changed).
+    :return dict: name -> pygame.Surface or pygame.mixer.Sound.
+    """
+    found = _read_index(path)
+    expected = _index(images, sounds)
+    if not found or any(found[0].get(key) != value for key, value in expected.items()):
+        bake(path, images, sounds)
+        found = _read_index(path)
+    index, data_start = found
+
+    with open(path, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return {name: _build(data, data_start + entry['offset'], entry)
+                for name, entry in index['entries'].items()}
+
+
+def _build(data: mmap.mmap, start: int, entry: dict):
+    " Surface or Sound from a mapped blob (copied: the map can be closed)."
+    with memoryview(data)[start:start + entry['length']] as blob:
+        if entry['type'] == 'sound':
+            return pygame.mixer.Sound(buffer=blob)
+        image = pygame.image.frombuffer(blob, entry['size'], 'RGBA')
+        # one time conversion to the display format (blits are plain copies)
+        image = image.convert_alpha() if entry['alpha'] else image.convert()
+        return image
+
+
+if __name__ == "__main__":
+    # python assets.py : bakes the asset bundle again (settings.ASSET_BUNDLE)
+    import time
+    import settings as config
+
+    start = time.perf_counter()
+    bake(config.ASSET_BUNDLE, config.IMAGES, config.SOUNDS)
+    print(f"Baked {config.ASSET_BUNDLE} ({os.path.getsize(config.ASSET_BUNDLE) / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    load_assets(config.ASSET_BUNDLE, config.IMAGES, config.SOUNDS)
+    print(f"Loaded in {(time.perf_counter() - start) * 1e3:.1f} ms")
@@ -0,0 +1,220 @@
+import os
+
+# off-screen: no window and no audio device needed (set before pygame is imported)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import json
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+from pygame import Surface
+
+import settings as config
+from camera import Camera
+from level import Level
+from player import Player
+from headless import mute_sounds
+from hud import GlyphCache, HudText
+from features import HAND_LANDMARKS, LEFT, RIGHT, count_raised, landmarks_array, \
+    count_fingers_batch
+
+PLATFORM_COUNTS = (15, 50, 200)  # 15: settings.MAX_PLATFORM_NUMBER
+SEED = 0
+
+
+# ============= Fixtures =============
+# Everything is rebuilt from a fixed seed so runs are comparable between commits.
+
+def make_scene(platforms: int) -> SimpleNamespace:
+    """ Camera, level and player singletons in a fixed state.
+    :param platforms int: number of platforms, spread over the visible screen.
+    """
+    random.seed(SEED)
+    camera = Camera()
+    camera.reset()
+    lvl = Level(platforms)
+    lvl.update()  # generates them, then spread lowest first (update keeps them all)
+    step = (config.YWIN - 2 * config.PLATFORM_SIZE[1]) / platforms
+    for i, platform in enumerate(lvl.platforms):
+        platform.respawn(random.randint(0, config.XWIN - config.PLATFORM_SIZE[0]),
+                         int(config.YWIN - 2 * config.PLATFORM_SIZE[1] - i * step),
+                         initial_bonus=i % 5 == 0)
+    # (under the platforms: falling, every platform is checked, none is hit)
+    player = Player(config.HALF_XWIN, config.YWIN, *config.PLAYER_SIZE, config.PLAYER_COLOR,
+                    camera=False)
+    player.reset()
+    player._velocity.update(3, 1)
+    return SimpleNamespace(camera=camera, lvl=lvl, player=player,
+                           surface=Surface(config.DISPLAY).convert())
+
+
+def make_hands(hands: int = 2) -> tuple:
+    """ Fixed landmarks of open hands (mirrored frame), as arrays and as
+    mediapipe like results.
+    """
+    rng = np.random.default_rng(SEED)
+    landmarks = rng.random((hands, HAND_LANDMARKS, 3), np.float32)
+    landmarks[:, 8::4, 1] = landmarks[:, 6::4, 1] - .1  # finger tips over pips
+    handedness = np.array([LEFT, RIGHT][:hands], np.int8)
+    results = SimpleNamespace(
+        multi_hand_landmarks=[
+            SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand])
+            for hand in landmarks.tolist()],
+        multi_handedness=[
+            SimpleNamespace(classification=[SimpleNamespace(label="Right" if h else "Left")])
+            for h in handedness])
+    return landmarks, handedness, results
+
+
+# ============= Benchmarks =============
+
+def benchmarks() -> dict:
+    """ name -> setup function, returning the function to measure
+    (called without arguments). Fixtures are built right before measuring
+    as the game objects are singletons.
+    """
+    def level_update(count):
+        return make_scene(count).lvl.update
+
+    def level_draw(count):
+        scene = make_scene(count)
+        return lambda: scene.lvl.draw(scene.surface)
+
+    def player_collisions(count):
+        return make_scene(count).player.collisions
+
+    def fix_velocity():
+        return make_scene(PLATFORM_COUNTS[0]).player._fix_velocity
+
+    def camera_apply():
+        scene = make_scene(PLATFORM_COUNTS[0])
+        return lambda: scene.camera.apply(scene.player)
+
+    def sprite_draw():
+        scene = make_scene(PLATFORM_COUNTS[0])
+        return lambda: scene.player.draw(scene.surface)
+
+    def hud_same():
+        text = HudText(GlyphCache(config.SMALL_FONT), " m")
+        return lambda: text.update(1234, config.GRAY)
+
+    def hud_changed():
+        text = HudText(GlyphCache(config.SMALL_FONT), " m")
+        values = iter(range(10 ** 9))
+        return lambda: text.update(next(values) % 10000, config.GRAY)
+
+    cases = {}
+    for count in PLATFORM_COUNTS:
+        cases[f"Level.update[{count}]"] = lambda n=count: level_update(n)
+        cases[f"Level.draw[{count}]"] = lambda n=count: level_draw(n)
+        cases[f"Player.collisions[{count}]"] = lambda n=count: player_collisions(n)
+    cases["Player._fix_velocity"] = fix_velocity
+    cases["Camera.apply"] = camera_apply
+    cases["Sprite.draw"] = sprite_draw
+    cases["SMALL_FONT.render[score]"] = \
+        lambda: lambda: config.SMALL_FONT.render("1234 m", 1, config.GRAY)
+    cases["SMALL_FONT.render[ability]"] = \
+        lambda: lambda: config.SMALL_FONT.render("100", 1, config.WHITE)
+    cases["HudText.update[same]"] = hud_same
+    cases["HudText.update[changed]"] = hud_changed
+
+    landmarks, handedness, results = make_hands()
+    records = np.repeat(landmarks[None], 1000, 0)
+    labels = np.repeat(handedness[None], 1000, 0)
+    cases["features.landmarks_array"] = lambda: lambda: landmarks_array(results, mirror=True)
+    cases["features.count_raised"] = lambda: lambda: count_raised(landmarks, handedness)
+    cases["features.count_fingers_batch[1000]"] = \
+        lambda: lambda: count_fingers_batch(records, labels)
+    return cases
+
+
+def measure(function, repeat: int = 5, min_time: float = .2) -> dict:
+    """ Times a function and its memory use.
+    :param repeat int: timing runs (the fastest one is kept).
+    :param min_time float: minimum duration (s) of a timing run.
+    :return dict: ns per call, peak transient bytes of a call and
+        net allocated memory blocks per call (> 0: something accumulates).
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / .2))
+    ns_op = min(timer.repeat(repeat, number)) / number * 1e9
+
+    calls = 100
+    tracemalloc.start()
+    function()  # (caches filled on first call are not counted)
+    peak = 0
+    blocks = sys.getallocatedblocks()
+    for _ in range(calls):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        function()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    blocks = (sys.getallocatedblocks() - blocks) / calls
+    tracemalloc.stop()
+    return {'ns_op': ns_op, 'peak_bytes': peak, 'blocks_op': blocks}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """ Prints results against a baseline.
+    :param threshold float: relative slowdown considered as a regression.
+    :return list: names of the regressed benchmarks.
+    """
+    regressions = []
+    print(f"{'benchmark':<38}{'baseline':>12}{'now':>12}{'change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<38}{'-':>12}{result['ns_op']:>10.0f}ns{'new':>9}")
+            continue
+        before = baseline[name]['ns_op']
+        change = result['ns_op'] / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<38}{before:>10.0f}ns{result['ns_op']:>10.0f}ns{change:>+9.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    # ============= MICRO BENCHMARKS =============
+    # python bench.py --save base.json   (then, on another commit)
+    # python bench.py --compare base.json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-frame hot paths micro benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="only names containing this")
+    parser.add_argument("--save", help="write results to this JSON baseline")
+    parser.add_argument("--compare", help="compare with this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=.1,
+                        help="slowdown reported as a regression (default 10%%)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config.init_display(hidden=True)
+    mute_sounds()
+    results = {}
+    for name, setup in benchmarks().items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup(), args.repeat)
+        if not args.compare:
+            result = results[name]
+            print(f"{name:<38}{result['ns_op']:>12.0f} ns/op"
+                  f"{result['peak_bytes']:>10} B peak{result['blocks_op']:>8.2f} blocks/op")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+                       'python': sys.version.split()[0], 'results': results}, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
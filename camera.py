@@ -17,6 +17,7 @@ class Camera(Singleton):
     # constructor called on new instance: Camera()
     def __init__(self, lerp=5, width=config.XWIN, height=config.YWIN):
         self.state = Rect(0, 0, width, height)
+        self.view_y = 0  # render scroll: state.y, or between two steps (interpolate)
         self.lerp = lerp
         self.center = height // 2
         self.maxheight = self.center
@@ -24,19 +25,25 @@ class Camera(Singleton):
     def reset(self) -> None:
         " Called only when game restarts (after player death)."
         self.state.y = 0
+        self.view_y = 0
         self.maxheight = self.center
 
     def apply_rect(self, rect: Rect) -> Rect:
         """ Transforms given rect relative to camera position.
         :param rect pygame.Rect: the rect to transform
         """
-        return rect.move((0, -self.state.topleft[1]))
+        return rect.move((0, -self.view_y))
 
     def apply(self, target: Sprite) -> Rect:
-        """ Returns new target render position based on current camera position.
+        """ Updates target render position based on current camera position
+        (in place: its camera_rect, no new Rect each frame).
         :param target Sprite: a sprite that wants to get its render position.
+        :return pygame.Rect: target.camera_rect.
         """
-        return self.apply_rect(target.rect)
+        camera_rect = target.camera_rect
+        camera_rect.x = target.rect.x
+        camera_rect.y = target.rect.y - self.view_y
+        return camera_rect
 
     def update(self, target: Rect) -> None:
         """ Scrolls up to maxheight reached by player.
@@ -50,3 +57,11 @@ class Camera(Singleton):
         # calculate scrolling speed required
         speed = ((self.state.y + self.center) - self.maxheight) / self.lerp
         self.state.y -= speed
+        self.view_y = self.state.y
+
+    def interpolate(self, previous_y: int, alpha: float) -> None:
+        """ Render scroll between the previous and the last physics step.
+        :param previous_y int: state.y before the last step.
+        :param alpha float: 0 (previous step) to 1 (last step).
+        """
+        self.view_y = round(previous_y + (self.state.y - previous_y) * alpha)
@@ -1,20 +1,53 @@
 import paho.mqtt.client as mqtt
 import numpy as np
 from datetime import datetime
+import threading
+import time
+
+from metrics import Histogram, MQTT_BUCKETS
 
 class connection():
   def __init__(self, on_message, id) -> None:
     def on_connect(client, userdata, flags, rc):
       client.subscribe("ece180d/A412", qos=1)
 
+    # metrics (see metrics.py): our own messages come back on the topic,
+    # the time they take gives the round trip latency
+    self.published = 0
+    self.received = 0
+    self.round_trip = Histogram(MQTT_BUCKETS)
+    # (messages end with a sequence number: identical ones are told apart)
+    self._sequence = 0
+    self._pending = {}  # sequence number -> publish time
+    # (publish runs on the game thread, on_message on the network thread)
+    self._pending_lock = threading.Lock()
+    own_prefix = (str(id) + ',').encode('ascii')
+
+    def on_message_timed(client, userdata, msg):
+      self.received += 1
+      if msg.payload.startswith(own_prefix):
+        sequence = msg.payload.rpartition(b',')[2]
+        if sequence.isdigit():
+          with self._pending_lock:
+            sent = self._pending.pop(int(sequence), None)
+          if sent is not None:
+            self.round_trip.observe(time.perf_counter() - sent)
+      on_message(client, userdata, msg)
+
     self.id = id
     self.client = mqtt.Client()
     self.client.on_connect = on_connect
-    self.client.on_message = on_message
+    self.client.on_message = on_message_timed
     self.client.connect_async('mqtt.eclipseprojects.io')
     self.client.loop_start()
     
   def publish(self, msg: str):
-    msg = str(self.id) + ',' + msg
+    self._sequence += 1
+    msg = str(self.id) + ',' + msg + ',' + str(self._sequence)
     print('sending msg: ', msg)
+    with self._pending_lock:
+      if len(self._pending) >= 64:  # (lost messages)
+        self._pending.pop(next(iter(self._pending)), None)
+      self._pending[self._sequence] = time.perf_counter()
     self.client.publish('ece180d/A412', msg, qos=1)
+    self.published += 1
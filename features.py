@@ -0,0 +1,74 @@
+import numpy as np
+
+# Handedness labels stored as numbers
+LEFT, RIGHT = 0, 1
+HAND_LANDMARKS = 21
+
+# Landmark indices (mediapipe hands)
+THUMB_IP, THUMB_TIP = 3, 4
+FINGER_PIPS = [6, 10, 14, 18]  # index, middle, ring, pinky
+FINGER_TIPS = [8, 12, 16, 20]
+
+
+def landmarks_array(results, mirror: bool = False) -> tuple:
+    """ Converts mediapipe hands results to NumPy arrays.
+    :param results: output of mediapipe Hands.process.
+    :param mirror bool: mirror x and swap labels (frame was not flipped).
+    :return tuple: (landmarks (hands, 21, 3) float32, handedness (hands,) int8).
+    """
+    if not (results and results.multi_hand_landmarks):
+        return np.zeros((0, HAND_LANDMARKS, 3), np.float32), np.zeros(0, np.int8)
+    landmarks = np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+         for hand in results.multi_hand_landmarks], np.float32)
+    handedness = np.array(
+        [LEFT if hand.classification[0].label == "Left" else RIGHT
+         for hand in results.multi_handedness], np.int8)
+    if mirror:
+        landmarks[..., 0] = 1 - landmarks[..., 0]
+        handedness = 1 - handedness
+    return landmarks, handedness
+
+
+def finger_masks(landmarks: np.ndarray, handedness: np.ndarray) -> np.ndarray:
+    """ Raised fingers of every hand (thumb, index, middle, ring, pinky).
+    Landmarks are those of a mirrored (selfie) frame, any leading dimensions.
+    :param landmarks np.ndarray: (..., 21, 3) or (..., 21, 2) landmarks.
+    :param handedness np.ndarray: (...) LEFT/RIGHT labels.
+    :return np.ndarray: (..., 5) bool.
+    """
+    # Thumb: TIP x position must be greater (left hand) or lower (right hand)
+    #   than IP x position.
+    # Other fingers: TIP y position must be lower than PIP y position,
+    #   as image origin is in the upper left corner.
+    thumb_dx = landmarks[..., THUMB_TIP, 0] - landmarks[..., THUMB_IP, 0]
+    return np.concatenate((
+        np.where(handedness == LEFT, thumb_dx > 0, thumb_dx < 0)[..., None],
+        landmarks[..., FINGER_TIPS, 1] < landmarks[..., FINGER_PIPS, 1]), axis=-1)
+
+
+def count_raised(landmarks: np.ndarray, handedness: np.ndarray) -> int:
+    " Total raised fingers of the given hands (mirrored frame landmarks)."
+    return int(np.count_nonzero(finger_masks(landmarks, handedness)))
+
+
+def count_fingers(results, mirrored_frame: bool = True) -> int:
+    """ Counts raised fingers over every detected hand.
+    :param results: output of mediapipe Hands.process.
+    :param mirrored_frame bool: False if the processed frame was not flipped.
+    """
+    return count_raised(*landmarks_array(results, mirror=not mirrored_frame))
+
+
+def count_fingers_batch(landmarks: np.ndarray, handedness: np.ndarray,
+                        hands: np.ndarray = None) -> np.ndarray:
+    """ Finger counts of many recorded frames at once.
+    :param landmarks np.ndarray: (frames, max_hands, 21, 3) landmarks.
+    :param handedness np.ndarray: (frames, max_hands) labels.
+    :param hands np.ndarray: (frames,) number of valid hands (default: all).
+    :return np.ndarray: (frames,) finger counts.
+    """
+    per_hand = finger_masks(landmarks, handedness).sum(-1)
+    if hands is not None:
+        per_hand = np.where(np.arange(per_hand.shape[1]) < hands[:, None], per_hand, 0)
+    return per_hand.sum(-1)
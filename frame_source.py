@@ -0,0 +1,153 @@
+from abc import ABC, abstractmethod
+import time
+
+import numpy as np
+import cv2
+
+
+class FrameSource(ABC):
+    """
+    A class to represent a source of BGR frames (camera, video, synthetic).
+
+    read() returns the next frame or None, paced at `rate` frames per
+    second when set (None: as fast as possible).
+    Frames returned may be reused by the source: do not modify them.
+    """
+
+    def __init__(self, rate: float = None):
+        self.rate = rate
+        self.finished = False
+        self.__next_time = 0.
+
+    def _pace(self) -> None:
+        " Waits for the next frame time (controlled rate)."
+        if not self.rate:
+            return
+        now = time.perf_counter()
+        if self.__next_time > now:
+            time.sleep(self.__next_time - now)
+        self.__next_time = max(self.__next_time, now) + 1 / self.rate
+
+    @abstractmethod
+    def read(self, out: np.ndarray = None):
+        """ Next frame (or None).
+        :param out np.ndarray: optional buffer to read into.
+        """
+
+    def set_resolution(self, width: int, height: int) -> None:
+        " Requests a frame size (sources may ignore it)."
+
+    def close(self) -> None:
+        " Releases the source."
+
+
+class CameraSource(FrameSource):
+    " Live webcam (cv2.VideoCapture), paced by the camera itself."
+
+    def __init__(self, index: int = 0):
+        super().__init__()
+        self.cap = cv2.VideoCapture(index)
+
+    def read(self, out: np.ndarray = None):
+        success, frame = self.cap.read(out)
+        return frame if success else None
+
+    def set_resolution(self, width: int, height: int) -> None:
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def close(self) -> None:
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """ Recorded video file played at a controlled rate.
+    (default: the file frame rate, loops at the end if loop is set)
+    """
+
+    def __init__(self, path: str, rate: float = 0, loop: bool = True):
+        self.cap = cv2.VideoCapture(path)
+        if rate == 0:
+            rate = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        super().__init__(rate)
+        self.loop = loop
+
+    def read(self, out: np.ndarray = None):
+        self._pace()
+        success, frame = self.cap.read(out)
+        if not success and self.loop and self.cap.get(cv2.CAP_PROP_FRAME_COUNT):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read(out)
+        if not success:
+            self.finished = True
+            return None
+        return frame
+
+    def close(self) -> None:
+        self.cap.release()
+
+
+class SyntheticSource(FrameSource):
+    """ Pre-rendered frames kept in memory (no decoding cost at all).
+    By default a skin colored hand moving over a noisy background,
+    alternating between open palm and fist.
+    """
+
+    def __init__(self, frames: list = None, rate: float = 30, loop: bool = True,
+                 shape: tuple = (480, 640, 3), count: int = 60):
+        super().__init__(rate)
+        self.frames = frames if frames is not None else render_hand_frames(shape, count)
+        self.loop = loop
+        self.__index = 0
+
+    def read(self, out: np.ndarray = None):
+        if self.__index >= len(self.frames):
+            if not self.loop:
+                self.finished = True
+                return None
+            self.__index = 0
+        self._pace()
+        frame = self.frames[self.__index]
+        self.__index += 1
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return out
+        return frame
+
+
+def render_hand_frames(shape: tuple = (480, 640, 3), count: int = 60,
+                       seed: int = 0) -> list:
+    """ Renders synthetic frames: a hand shape (palm + spread fingers or fist)
+    moving across a noisy background.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = shape[:2]
+    skin = (120, 160, 220)  # BGR
+    frames = []
+    for i in range(count):
+        frame = rng.integers(0, 60, shape, np.uint8)
+        cx = int(width * (.3 + .4 * i / max(count - 1, 1)))
+        cy = int(height * .6)
+        radius = height // 8
+        cv2.circle(frame, (cx, cy), radius, skin, -1)
+        if (i // 15) % 2 == 0:  # open palm
+            for angle in (-70, -35, 0, 35, 70):
+                a = np.radians(angle - 90)
+                tip = (int(cx + 2.5 * radius * np.cos(a)), int(cy + 2.5 * radius * np.sin(a)))
+                cv2.line(frame, (cx, cy), tip, skin, radius // 3)
+        frame.flags.writeable = False
+        frames.append(frame)
+    return frames
+
+
+def open_source(spec, rate: float = 0):
+    """ Builds a frame source from a spec.
+    :param spec: camera index (int), "synthetic" or a video file path.
+    :param rate float: frames per second for files/synthetic
+        (0: default rate, None: as fast as possible).
+    """
+    if isinstance(spec, int):
+        return CameraSource(spec)
+    if spec == "synthetic":
+        return SyntheticSource(rate=30 if rate == 0 else rate)
+    return VideoFileSource(spec, rate)
@@ -0,0 +1,575 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import time
+
+import numpy as np
+
+from features import count_raised
+
+# Worker states published in the mailbox
+STARTING, READY, UNAVAILABLE = 0, 1, 2
+
+# Inference worker tuning (overridable with GestureInput(**options))
+WORKER_OPTIONS = {
+    'latency_budget': .02,  # Seconds per hands.process call (picks capture resolution)
+    'roi_size': 256,  # Hand region is downscaled to this size (px)
+    'roi_max_misses': 5,  # Frames without hands before a full frame scan
+    'frame_budget': 1 / 60,  # Game frame duration (s)
+    'min_interval': 1 / 30,  # Fastest inference rate (s) when moving
+    'max_interval': .5,  # Slowest inference rate (s) when nothing moves
+    'motion_threshold': 3.,  # Mean thumbnail difference (0-255) seen as motion
+    'detection': "model",  # "model" or "tiered" (palm pre-detector gates the model)
+    'record': None,  # Landmark recording file path (see recording.py)
+}
+
+# Latest face landmarks shared by the head tilt input: timestamp + eye corners
+FACE_VALUES = 1 + 4 * 3
+
+
+class FrameRing:
+    """
+    A class to represent a ring buffer of camera frames in shared memory.
+
+    One writer (the capture process) fills the slots round-robin, any number
+    of readers copy the most recent complete frame without taking a lock.
+    Each slot is guarded by a sequence counter (odd while being written).
+    Frames can be smaller than the buffer shape (height/width are stored).
+    """
+
+    # per slot header: sequence, height, width, timestamp (ns)
+    HEADER = 4
+
+    def __init__(self, shape: tuple, slots: int = 3, name: str = None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header_bytes = 8 * (1 + slots * self.HEADER)
+        frame_bytes = int(np.prod(self.shape))
+        create = name is None
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=create, size=header_bytes + slots * frame_bytes)
+        self.name = self._shm.name
+
+        buf = self._shm.buf
+        self._head = np.ndarray((1,), np.int64, buf, 0)  # frames written
+        self._meta = np.ndarray((slots, self.HEADER), np.int64, buf, 8)
+        self._frames = np.ndarray((slots,) + self.shape, np.uint8, buf, header_bytes)
+        if create:
+            self._head[0] = 0
+            self._meta[:] = 0
+
+    def __reduce__(self):
+        # (spawned processes attach to the same block by name)
+        return FrameRing, (self.shape, self.slots, self.name)
+
+    @property
+    def frames_written(self) -> int:
+        return int(self._head[0])
+
+    def begin_write(self, height: int, width: int) -> np.ndarray:
+        """ Marks the next slot as being written.
+        :return np.ndarray: the slot view to write the frame into.
+        """
+        slot = int(self._head[0]) % self.slots
+        self._meta[slot, 0] += 1  # odd: readers will skip this slot
+        return self._frames[slot, :height, :width]
+
+    def commit_write(self, height: int, width: int, timestamp: int) -> None:
+        " Publishes the slot opened by begin_write()."
+        index = int(self._head[0])
+        meta = self._meta[index % self.slots]
+        meta[1], meta[2], meta[3] = height, width, timestamp
+        meta[0] += 1  # even: slot is stable again
+        self._head[0] = index + 1
+
+    def write(self, frame: np.ndarray, timestamp: int) -> None:
+        " Copies a whole frame into the next slot."
+        height, width = frame.shape[:2]
+        np.copyto(self.begin_write(height, width), frame)
+        self.commit_write(height, width, timestamp)
+
+    def read_latest(self, out: np.ndarray, last_index: int = -1):
+        """ Copies the most recent complete frame into out.
+        :param out np.ndarray: buffer with the ring shape.
+        :param last_index int: index of the last frame already read.
+        :return tuple: (index, frame view into out, timestamp) or None.
+        """
+        for _ in range(self.slots):
+            index = int(self._head[0]) - 1
+            if index < 0 or index == last_index:
+                return None
+            slot = index % self.slots
+            seq = int(self._meta[slot, 0])
+            if seq & 1:  # writer wrapped around on this slot
+                continue
+            height, width, timestamp = (int(v) for v in self._meta[slot, 1:])
+            frame = out[:height, :width]
+            np.copyto(frame, self._frames[slot, :height, :width])
+            if int(self._meta[slot, 0]) == seq:
+                return index, frame, timestamp
+        return None
+
+    def close(self) -> None:
+        " Detaches this process from the shared memory."
+        self._head = self._meta = self._frames = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        " Frees the shared memory (owner only, after every process closed it)."
+        self._shm.unlink()
+
+
+class ResultMailbox:
+    """
+    A class to represent a latest-value mailbox.
+
+    The inference worker overwrites the fields after each result, the game
+    reads them without ever waiting: if the worker holds the lock, the
+    values read on the previous poll are kept.
+    """
+
+    FIELDS = ('seq', 'state', 'camera', 'finger_count', 'timestamp', 'latency',
+              'resolution', 'rate', 'candidate', 'started')
+
+    def __init__(self, fields: tuple = FIELDS):
+        assert fields[0] == 'seq', "First mailbox field must be the sequence"
+        self._values = multiprocessing.Array('d', len(fields))
+        self._cache = [0.] * len(fields)
+        self._index = {name: i for i, name in enumerate(fields)}
+
+    def post(self, **values) -> None:
+        " Writer side: updates the given fields and bumps the sequence."
+        with self._values.get_lock():
+            for name, value in values.items():
+                self._values[self._index[name]] = value
+            self._values[0] += 1
+
+    def poll(self) -> bool:
+        """ Reader side: refreshes the cached values if the lock is free.
+        :return bool: True if a new value has been posted since last poll.
+        """
+        lock = self._values.get_lock()
+        if not lock.acquire(False):
+            return False
+        try:
+            if self._values[0] == self._cache[0]:
+                return False
+            self._cache[:] = self._values[:]
+        finally:
+            lock.release()
+        return True
+
+    def get(self, name: str) -> float:
+        " Last polled value of a field."
+        return self._cache[self._index[name]]
+
+
+def _warm_up(model, preprocessor, shapes) -> None:
+    """ Runs the model once per input size: the first process() calls pay the
+    graph initialization, this way it happens before the game starts.
+    :param shapes: full frame shapes (height, width, 3) to prepare.
+    """
+    for shape in shapes:
+        model.process(preprocessor.prepare(np.zeros(shape, np.uint8)))
+
+
+class HandPipeline:
+    """
+    A class to represent the per frame hand gesture work:
+    (palm pre-detector) -> scheduler -> hand region -> preprocessing
+    -> mediapipe hands -> finger count.
+
+    Runs in the inference process, or synchronously for benchmarks
+    and regression tests (see python gesture.py --help).
+    """
+
+    def __init__(self, resolutions: tuple, resolution, options: dict, face=None):
+        """
+        :param resolutions tuple: capture resolutions (w, h), best first.
+        :param resolution: shared value holding the picked resolution index.
+        :param options dict: worker tuning (see WORKER_OPTIONS).
+        :param face: shared latest face landmarks (FACE_VALUES), for recording.
+        """
+        import mediapipe as mp
+        from tracking import RegionTracker, ResolutionGovernor
+        from preprocess import Preprocessor
+        from scheduler import InferenceScheduler
+        from predetect import PalmDetector
+
+        self.resolutions = resolutions
+        self.roi_size = options['roi_size']
+        self.hands = mp.solutions.hands.Hands(
+            model_complexity=0, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        self.preprocessor = Preprocessor(options['roi_size'])
+        self.tracker = RegionTracker(options['roi_size'], options['roi_max_misses'])
+        self.governor = ResolutionGovernor(resolutions, options['latency_budget'], resolution)
+        self.scheduler = InferenceScheduler(
+            options['frame_budget'], options['min_interval'],
+            options['max_interval'], options['motion_threshold'])
+        self.palm_detector = PalmDetector() if options['detection'] == "tiered" else None
+
+        self.recorder = None
+        if options['record']:
+            from recording import LandmarkRecorder
+            self.recorder = LandmarkRecorder(options['record'])
+            self.__shared_face = face
+            self.__face = np.zeros(FACE_VALUES, np.float32)
+
+    def warm_up(self) -> None:
+        " Initializes the model on every input size (before the game)."
+        _warm_up(self.hands, self.preprocessor,
+                 [(h, w, 3) for w, h in self.resolutions] + [(self.roi_size,) * 2 + (3,)])
+
+    def process(self, image: np.ndarray, now: float, frame_time: float) -> dict:
+        """ Analyses one frame.
+        :param image np.ndarray: BGR frame (not mirrored).
+        :param now float: current time (s), the scheduling clock.
+        :param frame_time float: time (s) the game spends working per frame.
+        :return dict: mailbox fields to post.
+        """
+        start = time.perf_counter()
+        if self.palm_detector and not self.palm_detector.detect(image):
+            # tiered detection: no open palm candidate, the model is skipped
+            return {'finger_count': 0, 'candidate': 0}
+        if not self.scheduler.should_run(image, now, frame_time):
+            # nothing moved (or no headroom): last finger count still holds
+            return {'rate': self.scheduler.rate}
+        self.scheduler.ran(now)
+
+        # only the region around last known hands, downscaled (not flipped)
+        region, box = self.tracker.crop(image)
+        prepared = self.preprocessor.prepare(region)
+        # (the governor only sees the model: scheduling, pre-detection and
+        # preparation are not counted)
+        model_start = time.perf_counter()
+        results = self.hands.process(prepared)
+        self.governor.observe(time.perf_counter() - model_start)
+        landmarks = self.preprocessor.read_landmarks(results)
+        self.tracker.update(landmarks, box, image.shape)
+        # mirror the landmarks instead of the frame
+        self.preprocessor.mirror(len(landmarks))
+        finger_count = count_raised(landmarks, self.preprocessor.handedness[:len(landmarks)])
+        if self.recorder:
+            self._record(now, box, image.shape, landmarks, finger_count)
+
+        latency = time.perf_counter() - start
+        return {'finger_count': finger_count, 'latency': latency, 'candidate': 1,
+                'resolution': self.governor.index, 'rate': self.scheduler.rate,
+                'started': start}
+
+    def _record(self, now: float, box: tuple, frame_shape: tuple,
+                landmarks: np.ndarray, finger_count: int) -> None:
+        " Records the frame landmarks (with the face ones if recent)."
+        face = None
+        if self.__shared_face is not None:
+            # (0: being written, changed after the copy: written meanwhile)
+            timestamp = self.__shared_face[0]
+            self.__face[:] = self.__shared_face[:]
+            if timestamp and self.__shared_face[0] == timestamp and now - timestamp < .1:
+                face = self.__face[1:].reshape(4, 3)
+        self.recorder.record(now, box, frame_shape, landmarks, self.preprocessor.handedness,
+                             finger_count, face)
+
+    def close(self) -> None:
+        self.hands.close()
+        if self.recorder:
+            self.recorder.close()
+
+
+def _capture_main(ring: FrameRing, mailbox: ResultMailbox, source,
+                  resolutions: tuple, resolution, stop) -> None:
+    " Capture process (the camera is reported UNAVAILABLE if it fails)."
+    try:
+        _capture_loop(ring, mailbox, source, resolutions, resolution, stop)
+    except Exception:
+        mailbox.post(camera=UNAVAILABLE)
+        raise
+
+
+def _capture_loop(ring: FrameRing, mailbox: ResultMailbox, source,
+                  resolutions: tuple, resolution, stop) -> None:
+    " Capture process: frame source -> shared ring."
+    import cv2
+    from frame_source import open_source
+
+    source = open_source(source)
+    frame = source.read()
+    if frame is None:
+        mailbox.post(camera=UNAVAILABLE)
+        return
+    mailbox.post(camera=READY)
+
+    index = -1
+    while not stop.is_set():
+        # resolution picked by the inference process (latency budget)
+        if resolution.value != index:
+            index = resolution.value
+            width, height = resolutions[index]
+            source.set_resolution(width, height)
+            resized = np.empty((height, width, 3), np.uint8)
+
+        frame = source.read(frame if frame.flags.writeable else None)
+        if frame is None:
+            if source.finished:
+                break
+            continue
+        # (source may not support the requested size)
+        if frame.shape[0] != height or frame.shape[1] != width:
+            frame = cv2.resize(frame, (width, height), dst=resized)
+        ring.write(frame, time.perf_counter_ns())
+    source.close()
+    ring.close()
+
+
+def _inference_main(ring: FrameRing, mailbox: ResultMailbox, resolutions: tuple,
+                    resolution, frame_time, face, options: dict, stop) -> None:
+    " Inference process (its state is UNAVAILABLE if it fails)."
+    try:
+        _inference_loop(ring, mailbox, resolutions, resolution, frame_time, face,
+                        options, stop)
+    except Exception:
+        mailbox.post(state=UNAVAILABLE)
+        raise
+
+
+def _inference_loop(ring: FrameRing, mailbox: ResultMailbox, resolutions: tuple,
+                    resolution, frame_time, face, options: dict, stop) -> None:
+    """ Inference process: latest frame -> hand pipeline -> mailbox.
+    Exits (state UNAVAILABLE) once the capture process reports no camera.
+    """
+    pipeline = HandPipeline(resolutions, resolution, options, face)
+    pipeline.warm_up()
+    mailbox.post(state=READY)
+
+    buffer = np.empty(ring.shape, np.uint8)
+    last_index = -1
+    while not stop.is_set():
+        latest = ring.read_latest(buffer, last_index)
+        if latest is None:
+            mailbox.poll()
+            if int(mailbox.get('camera')) == UNAVAILABLE:
+                # (no frame will ever come: the capture failed)
+                mailbox.post(state=UNAVAILABLE)
+                break
+            time.sleep(.002)
+            continue
+        last_index, image, timestamp = latest
+        result = pipeline.process(image, time.perf_counter(), frame_time.value)
+        mailbox.post(timestamp=timestamp / 1e9, **result)
+    pipeline.close()
+    ring.close()
+
+
+class GestureInput:
+    """
+    A class to represent the hand gesture input.
+
+    Camera capture and mediapipe inference each run in their own process,
+    the game only reads the latest finger count from a mailbox.
+    Reading never blocks on the camera or on the model.
+    """
+
+    def __init__(self, source=0, resolutions: tuple = ((640, 480),),
+                 slots: int = 3, max_age: float = .5, **options):
+        """
+        :param source: camera index, video file path or "synthetic"
+            (see frame_source.open_source).
+        :param options: inference worker tuning (see WORKER_OPTIONS).
+        """
+        assert set(options) <= set(WORKER_OPTIONS), "Unknown gesture option !"
+        self.source = source
+        self.resolutions = tuple(resolutions)
+        self.slots = slots
+        self.max_age = max_age
+        self.options = dict(WORKER_OPTIONS, **options)
+        # shared frames fit the largest capture resolution
+        self.frame_shape = (max(h for _, h in self.resolutions),
+                            max(w for w, _ in self.resolutions), 3)
+        self._ring = None
+        self._resolution = multiprocessing.Value('i', 0)
+        self._frame_time = multiprocessing.Value('d', 0., lock=False)
+        # latest face landmarks (written by a HeadTiltInput, see head_tilt.py)
+        self.face = multiprocessing.Array('d', FACE_VALUES, lock=False)
+        self._mailbox = ResultMailbox()
+        self._stop = multiprocessing.Event()
+        self._processes = []
+
+    def start(self) -> None:
+        " Spawns the capture and inference processes."
+        if self._processes:
+            return
+        self._ring = FrameRing(self.frame_shape, self.slots)
+        self._processes = [
+            multiprocessing.Process(
+                target=_capture_main, name="gesture-capture", daemon=True,
+                args=(self._ring, self._mailbox, self.source,
+                      self.resolutions, self._resolution, self._stop)),
+            multiprocessing.Process(
+                target=_inference_main, name="gesture-inference", daemon=True,
+                args=(self._ring, self._mailbox, self.resolutions, self._resolution,
+                      self._frame_time, self.face, self.options, self._stop)),
+        ]
+        for process in self._processes:
+            process.start()
+
+    def stop(self) -> None:
+        " Stops the worker processes and frees the shared frames."
+        self._stop.set()
+        for process in self._processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._ring:
+            self._ring.close()
+            self._ring.unlink()
+            self._ring = None
+
+    @property
+    def ring(self) -> FrameRing:
+        " Shared camera frames (other inputs can read them, see head_tilt.py)."
+        return self._ring
+
+    @property
+    def state(self) -> int:
+        self._mailbox.poll()
+        return int(self._mailbox.get('state'))
+
+    @property
+    def failed(self) -> bool:
+        " A worker process failed (exception, model not loaded) or was killed."
+        return (self.state == UNAVAILABLE
+                or any(process.exitcode for process in self._processes))
+
+    @property
+    def available(self) -> bool:
+        " False if no camera could be opened (or the workers failed)."
+        self._mailbox.poll()
+        return int(self._mailbox.get('camera')) != UNAVAILABLE and not self.failed
+
+    @property
+    def ready(self) -> bool:
+        " Model warmed up and camera frames coming in (workers alive)."
+        return (self.state == READY and self._ring is not None
+                and self._ring.frames_written > 0 and not self.failed)
+
+    @property
+    def status(self) -> str:
+        " Human readable readiness."
+        self._mailbox.poll()
+        if int(self._mailbox.get('camera')) == UNAVAILABLE:
+            return "no camera"  # (the inference worker stops too)
+        if self.failed:
+            return "failed"
+        return "ready" if self.ready else "starting"
+
+    @property
+    def latency(self) -> float:
+        " Duration (s) of the last inference."
+        self._mailbox.poll()
+        return self._mailbox.get('latency')
+
+    @property
+    def resolution(self) -> tuple:
+        " Capture resolution (width, height) currently picked by the worker."
+        self._mailbox.poll()
+        return self.resolutions[int(self._mailbox.get('resolution'))]
+
+    @property
+    def candidate(self) -> bool:
+        " Whether the last analysed frame went through the model (tiered mode)."
+        self._mailbox.poll()
+        return bool(self._mailbox.get('candidate'))
+
+    @property
+    def inference_rate(self) -> float:
+        " Effective number of hands.process calls per second."
+        self._mailbox.poll()
+        return self._mailbox.get('rate')
+
+    @property
+    def inference_span(self) -> tuple:
+        """ Last model inference, for profiling (see profiler.py).
+        :return tuple: (start, duration, frame capture time) in s (perf_counter).
+        """
+        self._mailbox.poll()
+        return (self._mailbox.get('started'), self._mailbox.get('latency'),
+                self._mailbox.get('timestamp'))
+
+    def report_frame_time(self, frame_time: float) -> None:
+        """ Tells the scheduler how busy the game is (never blocks).
+        :param frame_time float: time (s) spent working on the last frame.
+        """
+        self._frame_time.value = frame_time
+
+    @property
+    def finger_count(self) -> int:
+        " Most recent finger count (0 if none or too old)."
+        self._mailbox.poll()
+        age = time.perf_counter() - self._mailbox.get('timestamp')
+        if age > self.max_age:
+            return 0
+        return int(self._mailbox.get('finger_count'))
+
+
+if __name__ == "__main__":
+    # Benchmark: whole gesture pipeline, synchronously, without a webcam
+    # python gesture.py --source synthetic --frames 600 --max-latency 15
+    # Frames are read as fast as possible but scheduled on a simulated
+    # clock (frame index / rate): the inferred frames do not depend on the
+    # machine speed. The gate is on the latency of inferred frames only.
+    import argparse
+    import sys
+    from frame_source import open_source
+
+    parser = argparse.ArgumentParser(description="Gesture pipeline benchmark")
+    parser.add_argument("--source", default="synthetic",
+                        help='"synthetic", a video file or a camera index')
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--rate", type=float, default=30,
+                        help="simulated source frame rate (scheduling clock)")
+    parser.add_argument("--no-schedule", action="store_true",
+                        help="run the model on every frame (no scheduler)")
+    parser.add_argument("--detection", default=WORKER_OPTIONS['detection'])
+    parser.add_argument("--max-latency", type=float, default=None,
+                        help="fail (exit 1) above this mean ms per inference")
+    args = parser.parse_args()
+
+    source = open_source(int(args.source) if args.source.isdigit() else args.source,
+                         rate=None)
+    resolution = multiprocessing.Value('i', 0)
+    pipeline = HandPipeline(((640, 480),), resolution,
+                            dict(WORKER_OPTIONS, detection=args.detection))
+    pipeline.warm_up()
+    if args.no_schedule:
+        pipeline.scheduler.max_interval = 0.  # every frame is due
+
+    read_times, process_times, latencies, counts = [], [], [], {}
+    frame = None
+    for index in range(args.frames):
+        start = time.perf_counter()
+        frame = source.read()
+        if frame is None:
+            break
+        now = time.perf_counter()
+        result = pipeline.process(frame, index / args.rate, 0.)
+        end = time.perf_counter()
+        read_times.append(now - start)
+        process_times.append(end - now)
+        if 'latency' in result:
+            latencies.append(result['latency'])
+        count = result.get('finger_count')
+        if count is not None:
+            counts[count] = counts.get(count, 0) + 1
+    pipeline.close()
+    source.close()
+
+    process_ms = np.array(process_times) * 1e3
+    latency_ms = np.array(latencies or [0.]) * 1e3
+    print(f"frames: {len(process_ms)}  inferences: {len(latencies)}")
+    print(f"read: {np.mean(read_times) * 1e3:.2f} ms/frame")
+    print(f"pipeline: {process_ms.mean():.2f} ms/frame (skipped frames included)")
+    print(f"inference: mean {latency_ms.mean():.2f} ms, "
+          f"p95 {np.percentile(latency_ms, 95):.2f} ms, max {latency_ms.max():.2f} ms")
+    print("finger counts:", dict(sorted(counts.items())))
+    if args.max_latency is not None and latency_ms.mean() > args.max_latency:
+        sys.exit(1)
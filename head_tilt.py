@@ -0,0 +1,172 @@
+import multiprocessing
+from math import atan2, degrees
+import time
+
+import numpy as np
+
+from gesture import FrameRing, ResultMailbox, READY, UNAVAILABLE, _warm_up
+
+# Face mesh landmarks used: eye corners only
+RIGHT_EYE_OUTER, RIGHT_EYE_INNER = 33, 133
+LEFT_EYE_INNER, LEFT_EYE_OUTER = 362, 263
+EYE_CORNERS = (RIGHT_EYE_OUTER, RIGHT_EYE_INNER, LEFT_EYE_INNER, LEFT_EYE_OUTER)
+
+FIELDS = ('seq', 'state', 'direction', 'angle', 'timestamp', 'latency')
+
+
+def tilt_angle(corners: np.ndarray, region: tuple) -> float:
+    """ Head roll (degrees) from the eye corners, positive when the head
+    tilts to the player's left.
+    :param corners np.ndarray: (4, 2+) EYE_CORNERS normalized to the region.
+    :param region tuple: (x0, y0, x1, y1) region in frame pixels.
+    """
+    x0, y0, x1, y1 = region
+    # (subject's right eye is on the left of a non mirrored frame)
+    dx = (corners[3, 0] - corners[0, 0]) * (x1 - x0)
+    dy = (corners[3, 1] - corners[0, 1]) * (y1 - y0)
+    return degrees(atan2(dy, dx))
+
+
+def _head_tilt_main(ring: FrameRing, mailbox: ResultMailbox, face, angle_on: float,
+                    angle_off: float, roi_size: int, stop) -> None:
+    " Head tilt process (its state is UNAVAILABLE if it fails)."
+    try:
+        _head_tilt_loop(ring, mailbox, face, angle_on, angle_off, roi_size, stop)
+    except Exception:
+        mailbox.post(state=UNAVAILABLE)
+        raise
+
+
+def _head_tilt_loop(ring: FrameRing, mailbox: ResultMailbox, face, angle_on: float,
+                    angle_off: float, roi_size: int, stop) -> None:
+    " Head tilt process: latest frame -> face region -> eye corners -> mailbox."
+    import mediapipe as mp
+    from tracking import RegionTracker
+    from preprocess import Preprocessor
+
+    face_mesh = mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1, refine_landmarks=False,
+        min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    preprocessor = Preprocessor(roi_size)
+    # face region: eye corners span about half of the face width
+    tracker = RegionTracker(roi_size, max_misses=3, margin=.75)
+    corners = np.zeros((1, len(EYE_CORNERS), 3), np.float32)
+    _warm_up(face_mesh, preprocessor, [ring.shape, (roi_size, roi_size, 3)])
+    mailbox.post(state=READY)
+
+    buffer = np.empty(ring.shape, np.uint8)
+    last_index = -1
+    direction = 0
+    while not stop.is_set():
+        latest = ring.read_latest(buffer, last_index)
+        if latest is None:
+            time.sleep(.002)
+            continue
+        last_index, image, timestamp = latest
+
+        start = time.perf_counter()
+        region, box = tracker.crop(image)
+        results = face_mesh.process(preprocessor.prepare(region))
+        if not results.multi_face_landmarks:
+            tracker.update(corners[:0], box, image.shape)
+            direction = 0
+            mailbox.post(direction=0, timestamp=timestamp / 1e9)
+            continue
+
+        # only the eye corners are read from the mesh
+        landmark = results.multi_face_landmarks[0].landmark
+        for i, index in enumerate(EYE_CORNERS):
+            corners[0, i, 0] = landmark[index].x
+            corners[0, i, 1] = landmark[index].y
+            corners[0, i, 2] = landmark[index].z
+        tracker.update(corners, box, image.shape)
+        # latest eye corners shared with the gesture input (recording),
+        # timestamp 0 while they are written: readers skip them
+        face[0] = 0
+        face[1:] = corners[0].ravel()
+        face[0] = start
+
+        # hysteresis: steer past angle_on, stop under angle_off
+        angle = tilt_angle(corners[0], box)
+        if abs(angle) >= angle_on:
+            direction = -1 if angle > 0 else 1
+        elif abs(angle) < angle_off:
+            direction = 0
+        mailbox.post(direction=direction, angle=angle, timestamp=timestamp / 1e9,
+                     latency=time.perf_counter() - start)
+    face_mesh.close()
+    ring.close()
+
+
+class HeadTiltInput:
+    """
+    A class to represent the head tilt steering input.
+
+    Reads the camera frames shared by a GestureInput in its own process and
+    publishes a steering direction (-1 left, 0, 1 right) from the head roll.
+    Reading never blocks.
+    """
+
+    def __init__(self, gestures, angle_on: float = 12, angle_off: float = 7,
+                 roi_size: int = 192, max_age: float = .25):
+        self.gestures = gestures
+        self.angle_on = angle_on
+        self.angle_off = angle_off
+        self.roi_size = roi_size
+        self.max_age = max_age
+        self._mailbox = ResultMailbox(FIELDS)
+        self._stop = multiprocessing.Event()
+        self._process = None
+
+    def start(self) -> None:
+        " Spawns the head tilt process (gestures must be started)."
+        if self._process:
+            return
+        assert self.gestures.ring, "Gesture input must be started first !"
+        self._process = multiprocessing.Process(
+            target=_head_tilt_main, name="head-tilt", daemon=True,
+            args=(self.gestures.ring, self._mailbox, self.gestures.face, self.angle_on,
+                  self.angle_off, self.roi_size, self._stop))
+        self._process.start()
+
+    def stop(self) -> None:
+        " Stops the head tilt process (before the gesture input)."
+        self._stop.set()
+        if self._process:
+            self._process.join(1)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    @property
+    def failed(self) -> bool:
+        " The head tilt process failed (exception, model not loaded) or was killed."
+        self._mailbox.poll()
+        return (int(self._mailbox.get('state')) == UNAVAILABLE
+                or bool(self._process and self._process.exitcode))
+
+    @property
+    def ready(self) -> bool:
+        " Face model warmed up (process alive)."
+        self._mailbox.poll()
+        return int(self._mailbox.get('state')) == READY and not self.failed
+
+    @property
+    def angle(self) -> float:
+        " Last measured head roll (degrees)."
+        self._mailbox.poll()
+        return self._mailbox.get('angle')
+
+    @property
+    def latency(self) -> float:
+        " Duration (s) of the last face inference."
+        self._mailbox.poll()
+        return self._mailbox.get('latency')
+
+    @property
+    def direction(self) -> int:
+        " Most recent steering direction (0 if none or too old)."
+        self._mailbox.poll()
+        if time.perf_counter() - self._mailbox.get('timestamp') > self.max_age:
+            return 0
+        return int(self._mailbox.get('direction'))
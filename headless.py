@@ -0,0 +1,127 @@
+from metrics import Histogram, MQTT_BUCKETS
+import settings as config
+
+
+class NullSound:
+    " Stand-in for pygame.mixer.Sound: plays nothing."
+
+    def play(self, *args, **kwargs) -> None:
+        pass
+
+
+class NullConnection:
+    " Stand-in for connection: publishes nothing (no network)."
+
+    def __init__(self, on_message=None, id=0):
+        self.id = id
+        self.published = self.received = 0
+        self.round_trip = Histogram(MQTT_BUCKETS)
+
+    def publish(self, msg: str) -> None:
+        pass
+
+
+class NullGestureInput:
+    " Stand-in for GestureInput: no camera, no worker process."
+
+    source = None
+    available = False
+    ready = True
+    failed = False
+    status = "off"
+    finger_count = 0
+    latency = 0.
+    inference_rate = 0.
+    inference_span = (0., 0., 0.)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def report_frame_time(self, frame_time: float) -> None:
+        pass
+
+
+def mute_sounds() -> None:
+    " Replaces every game sound by a NullSound."
+    for name in ('jump_sound', 'break_sound', 'basic_sound', 'death_sound'):
+        setattr(config, name, NullSound())
+
+
+class Autopilot:
+    """
+    A class to represent a (very) simple bot playing the game.
+
+    Used by simulations: steers the player towards the highest platform it
+    can reach, i.e. whose top it crosses while falling (below the jump apex)
+    after enough frames to get there horizontally (screen wraps around).
+    Steers towards the nearest platform below when none is reachable.
+    """
+
+    def __init__(self, tolerance: int = 10, start_speed: float = 5, accel: float = .5):
+        """
+        :param tolerance int: horizontal distance (px) considered on target.
+        :param start_speed float: player speed when it starts moving (px/frame).
+        :param accel float: player acceleration (px/frame²).
+        """
+        self.tolerance = tolerance
+        self.start_speed = start_speed
+        self.accel = accel
+        self.accel_frames = (config.PLAYER_MAX_SPEED - start_speed) / accel
+
+    def reach(self, frames: float) -> float:
+        " Horizontal distance (px) covered from rest in a number of frames."
+        if frames <= self.accel_frames:
+            return frames * (self.start_speed + self.accel * frames / 2)
+        return self.reach(self.accel_frames) + \
+            config.PLAYER_MAX_SPEED * (frames - self.accel_frames)
+
+    @staticmethod
+    def offset(player, platform) -> float:
+        " Horizontal distance (px) from the player to the platform center (wraps)."
+        span = config.XWIN - player.rect.width
+        dx = platform.rect.centerx - player.rect.centerx
+        return (dx + span / 2) % span - span / 2
+
+    def target(self, player, level):
+        """ Platform to land on next.
+        :return Platform: highest reachable platform, else nearest below (or None).
+        """
+        bottom = player.rect.bottom
+        speed, gravity = player._velocity.y, player.gravity
+        slack = (config.PLATFORM_SIZE[0] + player.rect.width) / 2 - self.tolerance
+        best = below = None
+        for platform in level.platforms:
+            top = platform.rect.top
+            if top >= bottom and (below is None or top < below.rect.top):
+                below = platform
+            # frames to fall to the top: speed * t + gravity * t² / 2 = top - bottom
+            discriminant = speed * speed + 2 * gravity * (top - bottom)
+            if discriminant < 0 or (best is not None and top >= best.rect.top):
+                continue  # (above the jump apex, or not higher)
+            frames = (discriminant ** .5 - speed) / gravity
+            if frames < 0:
+                continue  # (already passed, falling)
+            if abs(self.offset(player, platform)) - slack <= self.reach(frames):
+                best = platform
+        return best or below
+
+    def update(self, player, level) -> None:
+        """ Steers the player, should be called before each update.
+        :param player Player: the player to drive.
+        :param level Level: the level it plays.
+        """
+        target = self.target(player, level)
+        if target is None:
+            return
+
+        dx = self.offset(player, target)
+        direction = 0 if abs(dx) < self.tolerance else (1 if dx > 0 else -1)
+        if direction == player._input:
+            return
+        if direction:
+            player._steer(direction)
+        else:
+            player._input = 0
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+import pygame
+from pygame import Surface
+from pygame.font import Font
+
+
+class GlyphCache:
+    """
+    A class to represent a LRU cache of pre-rendered text pieces
+    (digits, suffixes) of a font, per color.
+    """
+
+    def __init__(self, font: Font, size: int = 64):
+        self.font = font
+        self.size = size
+        self.__glyphs = OrderedDict()  # (text, color) -> Surface
+
+    def get(self, text: str, color: tuple) -> Surface:
+        " Rendered text (antialiased, transparent background)."
+        key = (text, color)
+        glyph = self.__glyphs.get(key)
+        if glyph is None:
+            glyph = self.__glyphs[key] = self.font.render(text, 1, color)
+            if len(self.__glyphs) > self.size:
+                self.__glyphs.popitem(last=False)
+        else:
+            self.__glyphs.move_to_end(key)
+        return glyph
+
+
+class HudText:
+    """
+    A class to represent a HUD number (with an optional suffix).
+
+    The text surface is composed from cached glyphs, and only when the
+    displayed value or color changes: drawing it every frame is one blit.
+    """
+
+    def __init__(self, glyphs: GlyphCache, suffix: str = ""):
+        self.glyphs = glyphs
+        self.suffix = suffix
+        self.surface = None
+        self.__value = None
+        self.__color = None
+
+    def update(self, value: int, color: tuple) -> bool:
+        """ Sets the displayed value.
+        :return bool: True if the surface was composed again.
+        """
+        if value == self.__value and color == self.__color:
+            return False
+        self.__value, self.__color = value, color
+        pieces = [self.glyphs.get(digit, color) for digit in str(value)]
+        if self.suffix:
+            pieces.append(self.glyphs.get(self.suffix, color))
+        self.surface = Surface((sum(piece.get_width() for piece in pieces),
+                                max(piece.get_height() for piece in pieces)),
+                               pygame.SRCALPHA)
+        x = 0
+        for piece in pieces:
+            # (copies the glyph pixels: no blending over the transparent surface)
+            self.surface.blit(piece, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += piece.get_width()
+        return True
@@ -1,13 +1,16 @@
+from operator import attrgetter
 from random import randint
 from pygame import Surface
-import asyncio
 
 from singleton import Singleton
 from sprite import Sprite
+from camera import Camera
 import settings as config
 
 # return True with a chance of: P(X=True)=1/x
 chance = lambda x: not randint(0, x)
+# Render position of a sprite without camera
+_sprite_rect = attrgetter('rect')
 
 
 class Bonus(Sprite):
@@ -15,6 +18,7 @@ class Bonus(Sprite):
     A class to represent a bonus
     Inherits the Sprite class.
     """
+    __slots__ = ('parent', 'force')
 
     def __init__(self, parent: Sprite, color=config.GRAY,
                  force=config.PLAYER_BONUS_JUMPFORCE):
@@ -36,8 +40,11 @@ class Platform(Sprite):
 
     Should only be instantiated by a Level instance.
     Can have a bonus spring or broke on player jump.
+    Platforms are pooled by the level: respawn() reuses them,
+    and drawn by it with their bonus (see Level.draw).
     Inherits the Sprite class.
     """
+    __slots__ = ('breakable', 'active', '__level', '__bonus', '__spare_bonus')
 
     # (Overriding inherited constructor: Sprite.__init__)
     def __init__(self, x: int, y: int, width: int, height: int,
@@ -48,8 +55,10 @@ class Platform(Sprite):
         super().__init__(x, y, width, height, color)
 
         self.breakable = breakable
+        self.active = True  # False once broken (or not in the level)
         self.__level = Level.instance
         self.__bonus = None
+        self.__spare_bonus = None  # (kept for reuse on respawn)
         if initial_bonus:
             self.add_bonus(Bonus)
 
@@ -58,13 +67,31 @@ class Platform(Sprite):
     def bonus(self):
         return self.__bonus
 
+    def respawn(self, x: int, y: int, initial_bonus=False, breakable=False) -> None:
+        """ Reuses the platform at a new position (no allocation).
+        :param x int: new x position.
+        :param y int: new y position.
+        """
+        self.rect.x, self.rect.y = x, y
+        if breakable != self.breakable:
+            self.breakable = breakable
+            self.color = config.PLATFORM_COLOR_LIGHT if breakable else config.PLATFORM_COLOR
+        self.active = True
+        self.remove_bonus()
+        if initial_bonus:
+            self.add_bonus(Bonus)
+
     def add_bonus(self, bonus_type: type) -> None:
         """ Safely adds a bonus to the platform.
         :param bonus_type type: the type of bonus to add.
         """
         assert issubclass(bonus_type, Bonus), "Not a valid bonus type !"
         if not self.__bonus and not self.breakable:
-            self.__bonus = bonus_type(self)
+            if type(self.__spare_bonus) is bonus_type:
+                self.__bonus = self.__spare_bonus
+                self.__bonus.rect.x, self.__bonus.rect.y = self.__bonus._get_inital_pos()
+            else:
+                self.__bonus = self.__spare_bonus = bonus_type(self)
 
     def remove_bonus(self) -> None:
         " Safely removes platform's bonus."
@@ -76,101 +103,161 @@ class Platform(Sprite):
             self.__level.remove_platform(self)
             config.break_sound.play()
 
-    # ( Overriding inheritance: Sprite.draw() )
-    def draw(self, surface: Surface) -> None:
-        """ Like Sprite.draw().
-        Also draws the platform's bonus if it has one.
-        :param surface pygame.Surface: the surface to draw on.
-        """
-        # check if out of screen: should be deleted
-        super().draw(surface)
-        if self.__bonus:
-            self.__bonus.draw(surface)
-        if self.camera_rect.y + self.rect.height > config.YWIN:
-            self.__level.remove_platform(self)
-
 
 class Level(Singleton):
     """
     A class to represent the level.
 
     used to manage updates/generation of platforms.
+    Active platforms are sorted by decreasing y (generated upward): range
+    queries are binary searches (see platforms_in).
+    Platforms live in a fixed ring of reusable Platform objects, lowest
+    (oldest) first: the lowest leaving the screen is respawned on top.
+    Broken platforms stay in the ring, inactive, until they leave the screen:
+    the ring has some spare slots to keep generating meanwhile.
     Can be access via Singleton: Level.instance.
     (Check Singleton design pattern for more info)
     """
 
     # constructor called on new instance: Level()
-    def __init__(self):
+    def __init__(self, max_platforms: int = config.MAX_PLATFORM_NUMBER):
         self.platform_size = config.PLATFORM_SIZE
-        self.max_platforms = config.MAX_PLATFORM_NUMBER
+        self.max_platforms = max_platforms
         self.distance_min = min(config.PLATFORM_DISTANCE_GAP)
         self.distance_max = max(config.PLATFORM_DISTANCE_GAP)
 
         self.bonus_platform_chance = config.BONUS_SPAWN_CHANCE
         self.breakable_platform_chance = config.BREAKABLE_PLATFORM_CHANCE
 
-        self.__platforms = []
-        self.__to_remove = []
-
-        self.__base_platform = Platform(
-            config.HALF_XWIN - self.platform_size[0] // 2,  # X POS
-            config.HALF_YWIN + config.YWIN / 3,  # Y POS
-            *self.platform_size)  # SIZE
+        # ring of pooled platforms: __count slots in use from __head
+        self.__ring = [Platform(0, 0, *self.platform_size)
+                       for _ in range(max_platforms + config.PLATFORM_POOL_SLACK)]
+        self.__head = 0
+        self.__count = 0
+        self.__platforms = []  # active platforms, lowest first
+        self.__broken = []  # broken during the frame (removed in update)
+        self.__blits = []  # (image, position) of visible sprites, reused each frame
+        self.generated = 0  # platforms created since start
+        self.reset()
 
     # Public getter for __platforms so it remains private
     @property
     def platforms(self) -> list:
         return self.__platforms
 
-    async def _generation(self) -> None:
-        " Asynchronous management of platforms generation."
-        # Check how many platform we need to generate
-        nb_to_generate = self.max_platforms - len(self.__platforms)
-        for _ in range(nb_to_generate):
-            self.create_platform()
+    def _search(self, y: float, strict: bool) -> int:
+        """ Index of the first active platform whose y is lower than
+        (strict) or equal to y (binary search, platforms sorted by decreasing y).
+        """
+        platforms = self.__platforms
+        low, high = 0, len(platforms)
+        while low < high:
+            middle = (low + high) // 2
+            top = platforms[middle].rect.y
+            if top > y or (strict and top == y):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def platforms_in(self, top: float, bottom: float) -> list:
+        """ Active platforms whose y is within [top, bottom], lowest first.
+        :param top float: upper bound (lowest y).
+        :param bottom float: lower bound (greatest y).
+        """
+        return self.__platforms[self._search(bottom, False):self._search(top, True)]
 
     def create_platform(self) -> None:
-        " Create the first platform or a new one."
+        " Create the first platform or a new one (in the next free ring slot)."
+        platform = self.__ring[(self.__head + self.__count) % len(self.__ring)]
         if self.__platforms:
             # Generate a new random platform :
             # x position along screen width
             # y position starting from last platform y pos +random offset
+            top = self.__ring[(self.__head + self.__count - 1) % len(self.__ring)]
             offset = randint(self.distance_min, self.distance_max)
-            self.__platforms.append(Platform(
+            platform.respawn(
                 randint(0, config.XWIN - self.platform_size[0]),  # X POS
-                self.__platforms[-1].rect.y - offset,  # Y POS
-                *self.platform_size,  # SIZE
+                top.rect.y - offset,  # Y POS
                 initial_bonus=chance(self.bonus_platform_chance),  # HAS A Bonus
-                breakable=chance(self.breakable_platform_chance)))  # IS BREAKABLE
+                breakable=chance(self.breakable_platform_chance))  # IS BREAKABLE
+            self.generated += 1
         else:
             # (just in case) no platform: add the base one
-            self.__platforms.append(self.__base_platform)
+            platform.respawn(
+                config.HALF_XWIN - self.platform_size[0] // 2,  # X POS
+                config.HALF_YWIN + config.YWIN / 3)  # Y POS
+        self.__count += 1
+        self.__platforms.append(platform)
 
     def remove_platform(self, plt: Platform) -> bool:
-        """ Removes a platform safely.
+        """ Removes a platform safely (it becomes inactive).
         :param plt Platform: the platform to remove
         :return bool: returns true if platoform successfully removed
         """
-        if plt in self.__platforms:
-            self.__to_remove.append(plt)
+        if plt.active:
+            plt.active = False
+            self.__broken.append(plt)
             return True
         return False
 
     def reset(self) -> None:
         " Called only when game restarts (after player death)."
-        self.__platforms = [self.__base_platform]
+        for platform in self.__ring:
+            platform.active = False
+        self.__head = self.__count = 0
+        self.__platforms.clear()
+        self.__broken.clear()
+        self.create_platform()
 
     def update(self) -> None:
         " Should be called each frame in main game loop for generation."
-        for platform in self.__to_remove:
-            if platform in self.__platforms:
-                self.__platforms.remove(platform)
-        self.__to_remove = []
-        asyncio.run(self._generation())
+        # (platforms are sorted: broken ones are found by binary search)
+        for platform in self.__broken:
+            index = self._search(platform.rect.y, False)
+            while self.__platforms[index] is not platform:  # (same y)
+                index += 1
+            del self.__platforms[index]
+        self.__broken.clear()
+
+        # lowest platform out of screen: recycled
+        # (independent from draw calls: the level also runs headless)
+        camera_y = Camera.instance.state.y if Camera.instance else 0
+        while self.__count:
+            lowest = self.__ring[self.__head]
+            if lowest.rect.y - camera_y + lowest.rect.height <= config.YWIN:
+                break
+            if lowest.active:
+                lowest.active = False
+                del self.__platforms[0]
+            self.__head = (self.__head + 1) % len(self.__ring)
+            self.__count -= 1
+
+        # generation: keep max_platforms active ones (while the ring has room)
+        while (len(self.__platforms) < self.max_platforms
+               and self.__count < len(self.__ring)):
+            self.create_platform()
 
     def draw(self, surface: Surface) -> None:
-        """ Called each frame in main loop, draws each platform
-        :param surface pygame.Surface: the surface to draw on.
+        """ Called each frame in main loop, draws the platforms (and bonuses)
+        in the camera viewport with a single surface.blits() call.
+        :param surface pygame.Surface: the surface to draw on (or a DirtyRenderer).
         """
-        for platform in self.__platforms:
-            platform.draw(surface)
+        camera = Camera.instance
+        camera_y = camera.view_y if camera else 0
+        top, bottom = camera_y, camera_y + config.YWIN
+        # render positions: sprites camera_rect updated in place
+        position = camera.apply if camera else _sprite_rect
+        blits = self.__blits
+        blits.clear()
+        # (a bonus sits on its platform: visible while the platform is
+        # less than its height below the screen)
+        for platform in self.platforms_in(top - self.platform_size[1],
+                                          bottom + config.BONUS_SIZE[1]):
+            rect = platform.rect
+            if rect.y < bottom:
+                blits.append((platform.image, position(platform)))
+            bonus = platform.bonus
+            if bonus and bonus.rect.y < bottom:
+                blits.append((bonus.image, position(bonus)))
+        surface.blits(blits)
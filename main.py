@@ -1,3 +1,4 @@
+import startup
 from singleton import Singleton
 from camera import Camera
 from player import Player
@@ -6,8 +7,16 @@ import settings as config
 import pygame
 from pygame import mixer
 from connection import connection
+from headless import NullConnection, Autopilot, mute_sounds
+from profiler import FrameProfiler, NullProfiler
+from metrics import GameMetrics, serve_metrics
+from allocations import AllocationTracker, NullAllocationTracker
+from renderer import DirtyRenderer
+from hud import GlyphCache, HudText
 import random
+import time
 
+startup.record("imports", startup.ORIGIN)
 
 class Game(Singleton):
     """
@@ -19,18 +28,38 @@ class Game(Singleton):
     """
 
     # constructor called on new instance: Game()
-    def __init__(self) -> None:
+    # headless: no window, audio, camera or network (see simulate.py)
+    def __init__(self, headless: bool = False) -> None:
 
         # ============= Initialisation =============
-        mixer.init()
-        mixer.music.load('Images/Space-Jazz.mp3')
-        mixer.music.play()
+        start = time.perf_counter()
+        self.headless = headless
+        config.init_display(hidden=headless)
+        if headless:
+            mute_sounds()
+        else:
+            mixer.init()
+            mixer.music.load('Images/Space-Jazz.mp3')
+            mixer.music.play()
 
         self.id = random.randint(1, 10000)
         self.__alive = True
-        # Window / Render
-        self.window = pygame.display.set_mode(config.DISPLAY, config.FLAGS)
+        # Window / Render (off-screen surface when headless)
+        if headless:
+            self.window = pygame.Surface(config.DISPLAY)
+        else:
+            self.window = pygame.display.set_mode(config.DISPLAY, config.FLAGS)
         self.clock = pygame.time.Clock()
+        # fixed timestep: physics steps counted, and time not simulated
+        # (machine too slow to catch up, see settings.MAX_PHYSICS_STEPS)
+        self.physics_steps = 0
+        self.dropped_time = 0.
+        self.__previous = (0, 0, 0)  # camera y, player x, y before the last step
+        # static background composed once, only changed regions are redrawn
+        background = pygame.Surface(config.DISPLAY)
+        background.fill(config.WHITE)
+        background.blit(config.backround, (-100, -100))  # Backround image
+        self.renderer = DirtyRenderer(self.window, background.convert())
 
         # Instances
         self.camera = Camera()
@@ -39,13 +68,26 @@ class Game(Singleton):
             config.HALF_XWIN - config.PLAYER_SIZE[0] / 2,  # X POS
             config.HALF_YWIN + config.HALF_YWIN / 2,  # Y POS
             *config.PLAYER_SIZE,  # SIZE
-            config.PLAYER_COLOR  # COLOR
+            config.PLAYER_COLOR,  # COLOR
+            camera=not headless
         )
+        if config.PROFILE:
+            self.profiler = FrameProfiler(
+                config.PROFILE_FRAMES, self.player.gestures, 1 / config.FPS)
+        else:
+            self.profiler = NullProfiler()
+        if config.ALLOCATION_TRACKING:
+            self.allocations = AllocationTracker(config.ALLOCATION_INTERVAL)
+        else:
+            self.allocations = NullAllocationTracker()
 
         # User Interface
         self.initial_score = 0
         self.score = 0
-        self.score_txt = config.SMALL_FONT.render("0 m", 1, config.WHITE)
+        # (HUD numbers are composed from cached glyphs, only when they change)
+        self.hud_glyphs = GlyphCache(config.SMALL_FONT)
+        self.score_txt = HudText(self.hud_glyphs, " m")
+        self.score_txt.update(0, config.WHITE)
         self.score_pos = pygame.math.Vector2(10, 10)
 
         self.gameover_txt = config.LARGE_FONT.render("Game Over", 1, config.WHITE)
@@ -55,7 +97,8 @@ class Game(Singleton):
         self.gameover2_rect = self.gameover_txt.get_rect(
             center=(config.HALF_XWIN + 100, config.HALF_YWIN + 100))
         
-        self.abilities_txt = config.SMALL_FONT.render("3", 1, config.RED)
+        self.abilities_txt = HudText(self.hud_glyphs)
+        self.abilities_txt.update(3, config.RED)
         self.abilities_pos = pygame.math.Vector2(config.HALF_XWIN * 2 - 70, 10)
         self.initial_ability_frames = 100
 
@@ -78,8 +121,18 @@ class Game(Singleton):
                 self.awaiting_partner = False
                 self.initial_score = int(content[2])
                 self.initial_ability_frames = int(content[3])
-        connect = connection(handle_msg, self.id)
-        self.connection = connect
+        if headless:
+            self.connection = NullConnection(handle_msg, self.id)
+        else:
+            self.connection = connection(handle_msg, self.id)
+
+        # Live metrics page (background thread)
+        self.metrics = GameMetrics(self)
+        self.metrics_server = None
+        if not headless and config.METRICS_PORT:
+            self.metrics_server = serve_metrics(
+                self.metrics, config.METRICS_HOST, config.METRICS_PORT)
+        startup.record("game", start)
 
     # Draw menu function
     def draw_menu(self):
@@ -94,16 +147,35 @@ class Game(Singleton):
                 config.screen.blit(menu_text, position)
 
         config.screen.blit(title_text, (config.HALF_XWIN - 350, config.HALF_YWIN - 200))
+        self.draw_inputs_status()
         pygame.display.flip()
 
+    # Camera inputs warm up in background during menu and countdown
+    def draw_inputs_status(self):
+        status_text = config.menu_font.render(
+            "Gestures: " + self.player.inputs_status, True, config.BLACK)
+        config.screen.blit(status_text, (10, config.YWIN - 40))
+
+    # Like pygame.time.delay but the window keeps responding
+    def wait(self, ms):
+        end = pygame.time.get_ticks() + ms
+        while pygame.time.get_ticks() < end:
+            pygame.event.pump()
+            pygame.time.wait(10)
+
     # Countdown function
     def countdown(self):
         for count in range(3, 0, -1):
             config.screen.blit(config.menu_background, (0, 0))
             countdown_text = config.countdown_font.render(str(count), True, config.BLACK)
             config.screen.blit(countdown_text, (config.HALF_XWIN - 50, config.HALF_YWIN - 50))
+            self.draw_inputs_status()
             pygame.display.flip()
-            pygame.time.delay(1000)
+            self.wait(1000)
+        # camera inputs still warming up: give them a bit more time
+        deadline = pygame.time.get_ticks() + config.INPUT_WARMUP_TIMEOUT
+        while not self.player.inputs_ready and pygame.time.get_ticks() < deadline:
+            self.wait(50)
 
     def close(self):
         self.__alive = False
@@ -113,6 +185,22 @@ class Game(Singleton):
         self.camera.reset()
         self.lvl.reset()
         self.player.reset()
+        self._save_state()
+
+    def _save_state(self):
+        # positions before a physics step (rendering interpolates from them)
+        self.__previous = (self.camera.state.y, self.player.rect.x, self.player.rect.y)
+
+    def _interpolate(self, alpha):
+        # render positions between the previous and the last physics step
+        # (alpha: 0 previous, 1 last)
+        camera_y, x, y = self.__previous
+        self.camera.interpolate(camera_y, alpha)
+        rect = self.player.rect
+        if abs(rect.x - x) > config.HALF_XWIN:  # (wrapped around the screen)
+            x = rect.x
+        self.player.render_rect.x = round(x + (rect.x - x) * alpha)
+        self.player.render_rect.y = round(y + (rect.y - y) * alpha)
 
     def _event_loop(self):
         # ---------- User Events ----------
@@ -124,63 +212,167 @@ class Game(Singleton):
                     self.close()
                 if event.key == pygame.K_RETURN and self.player.dead:
                     self.reset()
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                # (window uncovered or restored: its content is lost)
+                self.renderer.invalidate()
             self.player.handle_event(event)
 
+    def _mark(self, phase):
+        " Ends a frame phase for the profiler and the allocation diagnostics."
+        self.profiler.mark(phase)
+        self.allocations.mark(phase)
+
     def _update_loop(self):
         # ----------- Update -----------
         self.player.update()
+        self._mark('player')
         self.lvl.update()
+        self._mark('level')
         if not self.player.dead and self.player.ability_frames_left < 100:
             self.player.ability_frames_left += 1/30
 
         if not self.player.dead:
             self.camera.update(self.player.rect)
+            self._mark('camera')
             # Calculate score and update UI txt
             self.score = -(self.camera.state.y // 50) + self.initial_score
-            self.score_txt = config.SMALL_FONT.render(
-                str(self.score) + " m", 1, config.GRAY)
+            self.score_txt.update(self.score, config.GRAY)
+            self._mark('score')
 
-    def _render_loop(self):
+    def _render_loop(self, alpha=1.):
         # ----------- Display -----------
-        self.window.fill(config.WHITE)
-        self.window.blit(config.backround, (-100, -100))  # Backround image
-        self.lvl.draw(self.window)
-        self.player.draw(self.window)
+        self._interpolate(alpha)
+        # (draw calls go through the renderer: drawn regions are kept)
+        self.renderer.begin()
+        self.lvl.draw(self.renderer)
+        self.player.draw(self.renderer)
+        self._mark('draw')
 
         # User Interface
         if self.player.dead:
             if self.is_multiplayer and not self.sent_dead:
                 self.sent_dead = True
                 self.connection.publish(f'partner_died,{self.score},{int(self.player.ability_frames_left)}')
-            self.window.blit(self.gameover_txt, self.gameover_rect)  # gameover txt
-            self.window.blit(self.gameover2_txt, self.gameover2_rect)  # gameover txt
+            self.renderer.blit(self.gameover_txt, self.gameover_rect)  # gameover txt
+            self.renderer.blit(self.gameover2_txt, self.gameover2_rect)  # gameover txt
         
-        self.window.blit(self.score_txt, self.score_pos)  # score txt
+        self.renderer.blit(self.score_txt.surface, self.score_pos)  # score txt
 
-        ability_txt = str(int(max(0, self.player.ability_frames_left)))
+        ability = int(max(0, self.player.ability_frames_left))
         if self.player.five_fingers:
-            self.abilities_txt = config.SMALL_FONT.render(ability_txt, 1, config.RED)
+            self.abilities_txt.update(ability, config.RED)
         else:
-            self.abilities_txt = config.SMALL_FONT.render(ability_txt, 1, config.WHITE)
+            self.abilities_txt.update(ability, config.WHITE)
             
-        self.window.blit(self.abilities_txt, self.abilities_pos)
+        self.renderer.blit(self.abilities_txt.surface, self.abilities_pos)
+        self._mark('hud')
+        self.renderer.add(self.profiler.draw(self.window))  # frame time graph
+        self._mark('profiler')
 
-        pygame.display.update()  # window update
-        self.clock.tick(config.FPS)  # max loop/s
+        dirty = self.renderer.end()
+        if not self.headless:
+            pygame.display.update(dirty)  # window update (changed regions only)
+            self._mark('display')
+            self.clock.tick(config.FPS)  # max loop/s
+            self._mark('tick')
 
     def run(self):
         self.player.ability_frames_left = self.initial_ability_frames
+        self.renderer.invalidate()  # (window still shows the menu)
+        # fixed timestep: physics runs PHYSICS_RATE steps per second of real
+        # time whatever the frame rate, frames render between the last two steps
+        step = 1 / config.PHYSICS_RATE
+        max_elapsed = step * config.MAX_PHYSICS_STEPS
+        accumulator = 0.
+        last = time.perf_counter()
+        self._save_state()
         # ============= MAIN GAME LOOP =============
         while self.__alive:
+            self.allocations.begin_frame()
+            self.profiler.begin_frame()
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            if elapsed > max_elapsed:  # (stalled: not caught up, game slows down)
+                self.dropped_time += elapsed - max_elapsed
+                elapsed = max_elapsed
+            accumulator += elapsed
+            # (work time of last frame: gesture inference backs off when busy)
+            self.player.gestures.report_frame_time(self.clock.get_rawtime() / 1000)
             self._event_loop()
-            self._update_loop()
-            self._render_loop()
+            self._mark('events')
+            while accumulator >= step:
+                self._save_state()
+                self._update_loop()
+                self.physics_steps += 1
+                accumulator -= step
+            self._render_loop(accumulator / step)
+            self.metrics.frame()
+            self.allocations.end_frame()
+        self.player.stop_inputs()
+        self.allocations.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self.profiler.save(config.PROFILE_TRACE_PATH)
         pygame.quit()
 
+    def simulate(self, frames: int, render: bool = False, stall_frames: int = None) -> dict:
+        """ Headless fixed-step simulation: runs the update loop as fast as
+        possible (no clock tick), played by an Autopilot, restarts on death.
+        A run whose score does not progress for stall_frames is stalled
+        (the autopilot is stuck): it is counted and restarted too.
+        :param frames int: number of frames (steps of 1 / PHYSICS_RATE) to simulate.
+        :param render bool: also render each frame (to the off-screen window).
+        :param stall_frames int: frames without progress (default: 10 s).
+        :return dict: throughput statistics.
+        """
+        if stall_frames is None:
+            stall_frames = 10 * config.PHYSICS_RATE
+        pilot = Autopilot()
+        deaths = stalls = best_score = 0
+        progress_score, progress_frame = self.score, 0
+        generated = self.lvl.generated
+        self.player.ability_frames_left = self.initial_ability_frames
+        start = time.perf_counter()
+        for frame in range(frames):
+            self.allocations.begin_frame()
+            pilot.update(self.player, self.lvl)
+            self._update_loop()
+            if render:
+                self._render_loop()
+            self.allocations.end_frame()
+            if self.score > progress_score:
+                progress_score, progress_frame = self.score, frame
+            stalled = frame - progress_frame >= stall_frames
+            if stalled:
+                stalls += 1
+                print(f"[simulate] stalled at score {self.score} "
+                      f"(frame {frame}, no progress for {stall_frames} frames)")
+            if self.player.dead or stalled:
+                deaths += self.player.dead
+                best_score = max(best_score, self.score)
+                self.reset()
+                # (score is computed again from the camera on next update)
+                progress_score, progress_frame = self.initial_score, frame
+        elapsed = time.perf_counter() - start
+        return {
+            'frames': frames,
+            'simulated_s': frames / config.PHYSICS_RATE,
+            'wall_s': elapsed,
+            'frames_per_s': frames / elapsed,
+            'speedup': frames / config.PHYSICS_RATE / elapsed,
+            'platforms_generated': self.lvl.generated - generated,
+            'deaths': deaths,
+            'stalls': stalls,
+            'best_score': max(best_score, self.score),
+        }
+
     # Menu init
     def menu(self):
         # Menu config
         menu = True
+        self.draw_menu()  # (first frame: launch is over)
+        if config.STARTUP_REPORT:
+            print(startup.report())
         while menu:
             self.draw_menu()
             if self.is_multiplayer and not self.awaiting_partner:
@@ -191,6 +383,7 @@ class Game(Singleton):
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     menu = False
+                    self.player.stop_inputs()
                     pygame.quit()
                     quit()
 
@@ -38,6 +38,7 @@ class Game(Singleton):
     def __init__(self) -> None:
 
         # ============= Initialisation =============
+        config.init_display()
         mixer.init()
         mixer.music.load('Images/Space-Jazz.mp3')
         mixer.music.play()
@@ -150,6 +151,8 @@ class Game(Singleton):
 
     def _update_loop(self):
         # ----------- Update -----------
+        # (work time of last frame: gesture inference backs off when busy)
+        self.player.gestures.report_frame_time(self.clock.get_rawtime() / 1000)
         self.player.update()
         self.lvl.update()
         if not self.player.dead and self.player.ability_frames_left < 100:
@@ -197,6 +200,7 @@ class Game(Singleton):
             self._event_loop()
             self._update_loop()
             self._render_loop()
+        self.player.stop_inputs()
         pygame.quit()
 
     # Menu init
@@ -213,6 +217,7 @@ class Game(Singleton):
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     menu = False
+                    self.player.stop_inputs()
                     pygame.quit()
                     quit()
 
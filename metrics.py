@@ -0,0 +1,166 @@
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+# Histogram bucket upper bounds (s)
+FRAME_BUCKETS = (.008, .012, 1 / 60, .02, .025, 1 / 30, .05, .1, .25)
+INFERENCE_BUCKETS = (.005, .01, .015, .02, .03, .05, .1, .25)
+MQTT_BUCKETS = (.01, .025, .05, .1, .25, .5, 1, 2.5)
+
+
+class Histogram:
+    """
+    A class to represent a cumulative histogram (Prometheus like).
+
+    Observing is a bisect and two additions: cheap enough for every frame.
+    """
+
+    def __init__(self, bounds: tuple):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last one: over every bound
+        self.count = 0
+        self.sum = 0.
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name: str, help: str) -> list:
+        " Text exposition lines of the histogram."
+        lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+        total = 0
+        for bound, count in zip(self.bounds + ('+Inf',), list(self.counts)):
+            total += count
+            le = bound if isinstance(bound, str) else f"{bound:g}"
+            lines.append(f'{name}_bucket{{le="{le}"}} {total}')
+        lines += [f"{name}_sum {self.sum:.6f}", f"{name}_count {total}"]
+        return lines
+
+
+class GameMetrics:
+    """
+    A class to represent the metrics of a running game.
+
+    Game.run calls frame() once per frame, the text page is rendered on
+    request by the metrics server thread (see MetricsServer).
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.started = time.perf_counter()
+        self.frame_time = Histogram(FRAME_BUCKETS)
+        self.inference_latency = Histogram(INFERENCE_BUCKETS)
+        self.frames = 0
+        self.fps = 0.  # (smoothed)
+        self.jitter = 0.  # frame time variation between frames (s, smoothed)
+        self.__frame_time = None
+        self.activations = 0  # ability triggered by showing five fingers
+        self.__last = None
+        self.__five_fingers = False
+        self.__inference = 0.
+
+    def frame(self) -> None:
+        " Should be called once per game frame."
+        now = time.perf_counter()
+        if self.__last is not None:
+            frame_time = now - self.__last
+            self.frame_time.observe(frame_time)
+            self.fps += (1 / max(frame_time, 1e-6) - self.fps) * .05
+            if self.__frame_time is not None:
+                # (interarrival jitter estimator, as in RTP: RFC 3550)
+                self.jitter += (abs(frame_time - self.__frame_time) - self.jitter) / 16
+            self.__frame_time = frame_time
+        self.__last = now
+        self.frames += 1
+
+        player = self.game.player
+        if player.five_fingers and not self.__five_fingers and not player.space_pressed:
+            self.activations += 1
+        self.__five_fingers = player.five_fingers
+        start, latency, _ = player.gestures.inference_span
+        if start and start != self.__inference:
+            self.inference_latency.observe(latency)
+            self.__inference = start
+
+    def render(self) -> str:
+        " Metrics page (Prometheus text format)."
+        game = self.game
+        uptime = time.perf_counter() - self.started
+        gestures = game.player.gestures
+        connection = game.connection
+        lines = [
+            f"doodle_uptime_seconds {uptime:.1f}",
+            f"doodle_frames_total {self.frames}",
+            f"doodle_fps {self.fps:.2f}",
+            *self.frame_time.lines("doodle_frame_seconds", "Time between two game frames."),
+            f"doodle_frame_jitter_seconds {self.jitter:.6f}",
+            f"doodle_physics_steps_total {game.physics_steps}",
+            f"doodle_physics_dropped_seconds_total {game.dropped_time:.3f}",
+            f"doodle_score {game.score}",
+            f"doodle_player_dead {int(game.player.dead)}",
+            f"doodle_platforms {len(game.lvl.platforms)}",
+            f"doodle_platforms_generated_total {game.lvl.generated}",
+            f'doodle_gesture_status{{status="{gestures.status}"}} 1',
+            f"doodle_gesture_inference_rate {gestures.inference_rate:.2f}",
+            *self.inference_latency.lines("doodle_gesture_inference_seconds",
+                                          "Duration of the hand model inferences."),
+            f"doodle_gesture_activations_total {self.activations}",
+            f"doodle_gesture_activations_per_minute {self.activations * 60 / uptime:.3f}",
+            f"doodle_mqtt_published_total {connection.published}",
+            f"doodle_mqtt_received_total {connection.received}",
+            *connection.round_trip.lines("doodle_mqtt_round_trip_seconds",
+                                         "Publish to reception of our own messages."),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    A class to represent the metrics HTTP server.
+
+    Serves GameMetrics.render() as plain text (GET / or /metrics)
+    from a background daemon thread.
+    """
+
+    def __init__(self, metrics: GameMetrics, host: str = "127.0.0.1", port: int = 8180):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # (no console spam on every scrape)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="metrics", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def serve_metrics(metrics: GameMetrics, host: str, port: int):
+    """ Starts a metrics server if the port is free.
+    :return MetricsServer: the started server, None if it could not start.
+    """
+    try:
+        server = MetricsServer(metrics, host, port)
+    except OSError as error:
+        print(f"Metrics server not started ({host}:{port}): {error}")
+        return None
+    server.start()
+    return server
@@ -1,15 +1,16 @@
-from math import copysign
+from math import copysign, ceil
 from pygame.math import Vector2
 from pygame.locals import KEYDOWN, KEYUP, K_LEFT, K_RIGHT, K_SPACE
-from pygame.sprite import collide_rect
+from pygame import Rect, Surface
 from pygame.event import Event
-import mediapipe as mp
-import cv2
 
 from singleton import Singleton
+from headless import NullGestureInput
 from sprite import Sprite
+from camera import Camera
 from level import Level
 import settings as config
+import startup
 
 # Return the sign of a number: getsign(-5)-> -1
 getsign = lambda x: copysign(1, x)
@@ -23,12 +24,19 @@ class Player(Sprite, Singleton):
     Can be access via Singleton: Player.instance.
     (Check Singleton design pattern for more info).
     """
+    __slots__ = ('__startrect', '__maxvelocity', '__startspeed', '_velocity', '_input',
+                 '_jumpforce', '_bonus_jumpforce', 'gravity', 'accel', 'deccel',
+                 'space_pressed', 'dead', 'gestures', 'head_tilt', '__tilt_input',
+                 'frame_num', 'five_fingers', 'ability_frames_left', 'render_rect')
 
     # (Overriding Sprite.__init__ constructor)
-    def __init__(self, *args):
+    # camera: False to play without webcam inputs (headless simulation)
+    def __init__(self, *args, camera: bool = True):
         # calling default Sprite constructor
         Sprite.__init__(self, *args)
         self.__startrect = self.rect.copy()
+        # drawn position: rect, or between two physics steps (Game._interpolate)
+        self.render_rect = self.rect.copy()
         self.__maxvelocity = Vector2(config.PLAYER_MAX_SPEED, 100)
         self.__startspeed = 5
 
@@ -45,14 +53,35 @@ class Player(Sprite, Singleton):
         self.space_pressed = False
         self.dead = False
 
-        # mediapipe
-        self.cap = cv2.VideoCapture(0)
-        success, _ = self.cap.read()
-        if not success:
-            self.cap = None
+        # mediapipe (camera and hand model run in worker processes,
+        # started now: they warm up during the menu and countdown)
+        self.gestures = NullGestureInput()
+        self.head_tilt = None
+        self.__tilt_input = 0
+        if camera:
+            # (imported only when used: the worker processes load the models)
+            from gesture import GestureInput
+            from head_tilt import HeadTiltInput
+            self.gestures = GestureInput(
+                config.FRAME_SOURCE, config.CAMERA_RESOLUTIONS, config.CAMERA_RING_SLOTS,
+                max_age=config.GESTURE_RESULT_MAX_AGE,
+                latency_budget=config.GESTURE_LATENCY_BUDGET,
+                roi_size=config.HAND_ROI_SIZE, roi_max_misses=config.HAND_ROI_MAX_MISSES,
+                frame_budget=1 / config.FPS, min_interval=config.GESTURE_MIN_INTERVAL,
+                max_interval=config.GESTURE_MAX_INTERVAL,
+                motion_threshold=config.GESTURE_MOTION_THRESHOLD,
+                detection=config.GESTURE_DETECTION, record=config.LANDMARK_RECORD_PATH)
+            with startup.step("gesture workers"):
+                self.gestures.start()
+
+            # hands-free steering (reads the same camera frames)
+            if config.STEERING_INPUT == "head_tilt":
+                self.head_tilt = HeadTiltInput(
+                    self.gestures, config.HEAD_TILT_ANGLE, config.HEAD_TILT_RELEASE_ANGLE,
+                    config.FACE_ROI_SIZE)
+                with startup.step("head tilt worker"):
+                    self.head_tilt.start()
 
-        mp_hands = mp.solutions.hands
-        self.hands = mp_hands.Hands( model_complexity=0, min_detection_confidence=0.5, min_tracking_confidence=0.5 )
         self.frame_num = 0
         self.five_fingers = False
         self.ability_frames_left = 100
@@ -60,6 +89,16 @@ class Player(Sprite, Singleton):
         # image setup
         self._image = config.doodle
 
+    # ( Overriding inheritance: Sprite.draw() )
+    def draw(self, surface: Surface) -> None:
+        """ Like Sprite.draw(), at render_rect.
+        :param surface pygame.Surface: the surface to draw on.
+        """
+        self.camera_rect.topleft = self.render_rect.topleft
+        if Camera.instance:
+            self.camera_rect.y -= Camera.instance.view_y
+        surface.blit(self.image, self.camera_rect)
+
     def _fix_velocity(self) -> None:
         """ Set player's velocity between max/min.
         Should be called in Player.update().
@@ -69,11 +108,35 @@ class Player(Sprite, Singleton):
         self._velocity.x = min(self._velocity.x, self.__maxvelocity.x)
         self._velocity.x = round(max(self._velocity.x, -self.__maxvelocity.x), 2)
 
+    @property
+    def inputs_ready(self) -> bool:
+        " Camera inputs warmed up (or unavailable, failed: nothing to wait for)."
+        if not self.gestures.available:  # (no camera or a dead worker)
+            return True
+        return self.gestures.ready and (
+            not self.head_tilt or self.head_tilt.ready or self.head_tilt.failed)
+
+    @property
+    def inputs_status(self) -> str:
+        " Human readable camera inputs readiness."
+        if self.gestures.available and not self.inputs_ready:
+            return "starting"
+        if self.gestures.available and self.head_tilt and self.head_tilt.failed:
+            return "head tilt failed"
+        return self.gestures.status
+
+    def stop_inputs(self) -> None:
+        " Stops camera based inputs worker processes (before quitting)."
+        if self.head_tilt:
+            self.head_tilt.stop()
+        self.gestures.stop()
+
     def reset(self) -> None:
         " Called only when game restarts (after player death)."
         self._velocity = Vector2()
         self.rect = self.__startrect.copy()
         self.camera_rect = self.__startrect.copy()
+        self.render_rect = self.__startrect.copy()
         self.dead = False
 
     def handle_event(self, event: Event) -> None:
@@ -84,13 +147,9 @@ class Player(Sprite, Singleton):
         if event.type == KEYDOWN:
             # Moves player only on x-axis (left/right)
             if event.key == K_LEFT:
-                self._velocity.x = -self.__startspeed
-                self._input = -1
-                self._image = config.doodle_l
+                self._steer(-1)
             elif event.key == K_RIGHT:
-                self._velocity.x = self.__startspeed
-                self._input = 1
-                self._image = config.doodle
+                self._steer(1)
             elif event.key == K_SPACE:
                 self.space_pressed = not self.space_pressed
 
@@ -100,6 +159,27 @@ class Player(Sprite, Singleton):
                     event.key == K_RIGHT and self._input == 1):
                 self._input = 0
 
+    def _steer(self, direction: int) -> None:
+        """ Starts moving left (-1) or right (1) on x-axis.
+        :param direction int: -1 or 1.
+        """
+        self._velocity.x = direction * self.__startspeed
+        self._input = direction
+        self._image = config.doodle_l if direction < 0 else config.doodle
+
+    def _head_tilt_steering(self) -> None:
+        """ Drives the horizontal input like arrow keys would.
+        Should be called in Player.update().
+        """
+        direction = self.head_tilt.direction
+        if direction == self.__tilt_input:
+            return
+        if direction:
+            self._steer(direction)
+        elif self._input == self.__tilt_input:  # (tilt released)
+            self._input = 0
+        self.__tilt_input = direction
+
     def jump(self, force: float = None) -> None:
         if not force: force = self._jumpforce
         self._velocity.y = -force
@@ -108,38 +188,55 @@ class Player(Sprite, Singleton):
         self.rect.bottom = obj.rect.top
         self.jump()
 
+    def _swept_collide(self, rect: Rect, top: int) -> bool:
+        """ Whether rect was hit during this frame move: it overlaps the area
+        swept by the player from its previous top (no tunneling at high speed).
+        :param rect pygame.Rect: the platform or bonus rect.
+        :param top int: player's top before the move.
+        """
+        return (rect.left < self.rect.right and rect.right > self.rect.left
+                and rect.top < self.rect.bottom and rect.bottom > top)
+
     def collisions(self) -> None:
         """ Checks for collisions with level.
-        Should be called in Player.update().
+        Should be called in Player.update(), after the move.
         """
         lvl = Level.instance
-        if not lvl: return
-        for platform in lvl.platforms:
-            # check falling and colliding <=> isGrounded ?
-            if self._velocity.y > .5:
-                # check collisions with platform's spring bonus
-                if platform.bonus and collide_rect(self, platform.bonus):
-                    self.onCollide(platform.bonus)
-                    self.jump(platform.bonus.force)
-                    config.jump_sound.play()
-                    self.ability_frames_left = min(100, self.ability_frames_left + 10)
-
-                # check collisions with platform
-                if collide_rect(self, platform):
-                    self.onCollide(platform)
-                    platform.onCollide()
-                    config.basic_sound.play()
+        # check falling and colliding <=> isGrounded ?
+        if not lvl or self._velocity.y <= .5: return
+        # only platforms (or their bonus above) in the vertical range swept
+        # by this frame move, highest (first reached) first
+        top = self.rect.top - ceil(self._velocity.y)
+        for platform in reversed(lvl.platforms_in(
+                top - config.PLATFORM_SIZE[1], self.rect.bottom + config.BONUS_SIZE[1])):
+            # check collisions with platform's spring bonus
+            if platform.bonus and self._swept_collide(platform.bonus.rect, top):
+                self.onCollide(platform.bonus)
+                self.jump(platform.bonus.force)
+                config.jump_sound.play()
+                self.ability_frames_left = min(100, self.ability_frames_left + 10)
+                return
+
+            # check collisions with platform
+            if self._swept_collide(platform.rect, top):
+                self.onCollide(platform)
+                platform.onCollide()
+                config.basic_sound.play()
+                return
 
     def update(self) -> None:
         """ For position and velocity updates.
         Should be called each frame.
         """
         # Check if player out of screen: should be dead
-        if self.camera_rect.y > config.YWIN * 2:
+        camera_y = Camera.instance.state.y if Camera.instance else 0
+        if self.rect.y - camera_y > config.YWIN * 2:
             if not self.dead:
                 config.death_sound.play()
             self.dead = True
             return
+        if self.head_tilt:
+            self._head_tilt_steering()
         # Velocity update (apply gravity, input acceleration)
         self._velocity.y += self.gravity
         if self._input:  # accelerate
@@ -154,8 +251,12 @@ class Player(Sprite, Singleton):
         self.rect.y += self._velocity.y
 
         self.collisions()
+        # drawn there, unless the game interpolates between steps
+        self.render_rect.x, self.render_rect.y = self.rect.x, self.rect.y
 
 
+        # ability is checked every 5 frames (inference rate is up to the
+        # gesture worker scheduler, see gesture.py)
         self.frame_num += 1
         if (self.frame_num % 5 != 0):
             return
@@ -169,51 +270,8 @@ class Player(Sprite, Singleton):
             self.gravity = config.GRAVITY
             self.five_fingers = False
         
-        if self.cap is None:
-            return
-        success, image = self.cap.read()
-        if not success:
-            return
-        
-        # To improve performance, optionally mark the image as not writeable
-        image = cv2.flip(image, 1)
-        image.flags.writeable = False
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(image)
-
-        fingerCount = 0
-        if results and results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Get hand index to check label (left or right)
-                handIndex = results.multi_hand_landmarks.index(hand_landmarks)
-                handLabel = results.multi_handedness[handIndex].classification[0].label
-
-                # Set variable to keep landmarks positions (x and y)
-                handLandmarks = []
-
-                # Fill list with x and y positions of each landmark
-                for landmarks in hand_landmarks.landmark:
-                    handLandmarks.append([landmarks.x, landmarks.y])
-
-                # Test conditions for each finger: Count is increased if finger is 
-                #   considered raised.
-                # Thumb: TIP x position must be greater or lower than IP x position, 
-                #   deppeding on hand label.
-                if handLabel == "Left" and handLandmarks[4][0] > handLandmarks[3][0]:
-                    fingerCount = fingerCount+1
-                elif handLabel == "Right" and handLandmarks[4][0] < handLandmarks[3][0]:
-                    fingerCount = fingerCount+1
-
-                # Other fingers: TIP y position must be lower than PIP y position, 
-                #   as image origin is in the upper left corner.
-                if handLandmarks[8][1] < handLandmarks[6][1]:       #Index finger
-                    fingerCount = fingerCount+1
-                if handLandmarks[12][1] < handLandmarks[10][1]:     #Middle finger
-                    fingerCount = fingerCount+1
-                if handLandmarks[16][1] < handLandmarks[14][1]:     #Ring finger
-                    fingerCount = fingerCount+1
-                if handLandmarks[20][1] < handLandmarks[18][1]:     #Pinky
-                    fingerCount = fingerCount+1
+        # latest result from the gesture worker (never waits for it)
+        fingerCount = self.gestures.finger_count
 
         if fingerCount >= 5 and self.ability_frames_left > 0:
             self.gravity = config.GRAVITY / 4
@@ -0,0 +1,77 @@
+import numpy as np
+import cv2
+
+
+class PalmDetector:
+    """
+    A class to represent the cheap open palm pre-detector.
+
+    First stage of the tiered gesture detection: runs on every frame,
+    the mediapipe model is only invoked to confirm its candidates.
+    Skin mask (YCrCb range) on a downscaled frame, then the gaps between
+    spread fingers are counted as deep, sharp convexity defects of the
+    largest skin contour (an open palm has 4 of them).
+    """
+
+    # skin color range in YCrCb
+    SKIN_LOWER = np.array((0, 133, 77), np.uint8)
+    SKIN_UPPER = np.array((255, 173, 127), np.uint8)
+
+    def __init__(self, size: tuple = (160, 120), min_area: float = .02,
+                 min_gaps: int = 3, min_depth: float = .15):
+        """
+        :param size tuple: (w, h) the frame is downscaled to.
+        :param min_area float: min hand contour area (fraction of the frame).
+        :param min_gaps int: finger gaps needed to be a candidate.
+        :param min_depth float: min gap depth (fraction of the hand size).
+        """
+        self.size = size
+        self.min_area = min_area * size[0] * size[1]
+        self.min_gaps = min_gaps
+        self.min_depth = min_depth
+        self.gaps = 0
+
+        # preallocated buffers
+        self.__small = np.zeros((size[1], size[0], 3), np.uint8)
+        self.__mask = np.zeros((size[1], size[0]), np.uint8)
+        self.__kernel = np.ones((3, 3), np.uint8)
+
+    def detect(self, frame: np.ndarray) -> bool:
+        """ Looks for an open palm candidate.
+        :param frame np.ndarray: BGR frame.
+        :return bool: True if mediapipe should confirm an open palm.
+        """
+        self.gaps = 0
+        cv2.resize(frame, self.size, dst=self.__small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.__small, cv2.COLOR_BGR2YCrCb, dst=self.__small)
+        cv2.inRange(self.__small, self.SKIN_LOWER, self.SKIN_UPPER, dst=self.__mask)
+        cv2.morphologyEx(self.__mask, cv2.MORPH_OPEN, self.__kernel, dst=self.__mask)
+
+        contours, _ = cv2.findContours(
+            self.__mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return False
+        hand = max(contours, key=cv2.contourArea)
+        if cv2.contourArea(hand) < self.min_area:
+            return False
+
+        hull = cv2.convexHull(hand, returnPoints=False)
+        if len(hull) < 4:
+            return False
+        try:
+            defects = cv2.convexityDefects(hand, hull)
+        except cv2.error:  # (self-intersecting contour)
+            return False
+        if defects is None:
+            return False
+
+        # finger gap: deep defect with a sharp angle (< 90 deg) at its bottom
+        _, _, width, height = cv2.boundingRect(hand)
+        points = hand.reshape(-1, 2).astype(np.float32)
+        defects = defects.reshape(-1, 4)
+        start, end, far = points[defects[:, 0]], points[defects[:, 1]], points[defects[:, 2]]
+        a, b = start - far, end - far
+        cosine = (a * b).sum(1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1) + 1e-6)
+        deep = defects[:, 3] / 256 > self.min_depth * max(width, height)
+        self.gaps = int(np.count_nonzero(deep & (cosine > 0)))
+        return self.gaps >= self.min_gaps
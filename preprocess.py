@@ -0,0 +1,110 @@
+import numpy as np
+import cv2
+
+from features import LEFT, RIGHT, HAND_LANDMARKS
+
+
+class Preprocessor:
+    """
+    A class to represent the camera frame preprocessing stage.
+
+    Resizes and converts frames (BGR -> RGB) into preallocated buffers
+    through the cv2 dst arguments: nothing is allocated per frame once
+    each output size has been seen.
+    Frames are not mirrored anymore, the landmarks are (see read_landmarks).
+    """
+
+    def __init__(self, input_size: int = 256, max_hands: int = 2):
+        self.input_size = input_size
+        self.__buffers = {}  # output size -> RGB buffer
+        self.landmarks = np.zeros((max_hands, HAND_LANDMARKS, 3), np.float32)
+        self.handedness = np.zeros(max_hands, np.int8)
+
+    def _buffer(self, size: tuple) -> np.ndarray:
+        buffer = self.__buffers.get(size)
+        if buffer is None:
+            buffer = self.__buffers[size] = np.empty((size[1], size[0], 3), np.uint8)
+        return buffer
+
+    def prepare(self, region: np.ndarray) -> np.ndarray:
+        """ Scales the region to input_size (largest side) and converts it to RGB.
+        :param region np.ndarray: BGR frame (or view of it).
+        :return np.ndarray: the reused RGB buffer, read only.
+        """
+        height, width = region.shape[:2]
+        scale = self.input_size / max(height, width)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = self._buffer(size)
+        image.flags.writeable = True
+        cv2.resize(region, size, dst=image, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+        # To improve performance, mark the image as not writeable
+        image.flags.writeable = False
+        return image
+
+    def read_landmarks(self, results) -> np.ndarray:
+        """ Copies hand landmarks and handedness into the preallocated arrays.
+        Coordinates are normalized to the processed region (not mirrored).
+        :param results: output of mediapipe Hands.process.
+        :return np.ndarray: view of the landmarks of detected hands (hands, 21, 3).
+        """
+        count = 0
+        if results and results.multi_hand_landmarks:
+            count = min(len(results.multi_hand_landmarks), len(self.landmarks))
+            for hand in range(count):
+                points = self.landmarks[hand]
+                for i, landmark in enumerate(results.multi_hand_landmarks[hand].landmark):
+                    points[i, 0] = landmark.x
+                    points[i, 1] = landmark.y
+                    points[i, 2] = landmark.z
+                label = results.multi_handedness[hand].classification[0].label
+                self.handedness[hand] = LEFT if label == "Left" else RIGHT
+        return self.landmarks[:count]
+
+    def mirror(self, count: int) -> None:
+        """ Mirrors the landmarks in place, as if the frame had been flipped.
+        (x becomes 1 - x and handedness labels are swapped)
+        :param count int: number of detected hands.
+        """
+        x = self.landmarks[:count, :, 0]
+        np.subtract(1, x, out=x)
+        handedness = self.handedness[:count]
+        np.subtract(1, handedness, out=handedness)
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: steady state preprocessing must not allocate arrays
+    from types import SimpleNamespace
+    import tracemalloc
+    import time
+
+    frame = np.random.randint(0, 256, (480, 640, 3), np.uint8)
+    point = SimpleNamespace(x=.5, y=.5, z=0.)
+    results = SimpleNamespace(
+        multi_hand_landmarks=[SimpleNamespace(landmark=[point] * HAND_LANDMARKS)],
+        multi_handedness=[SimpleNamespace(classification=[SimpleNamespace(label="Left")])])
+    preprocessor = Preprocessor()
+    regions = [frame, frame[100:356, 200:456], frame[90:346, 210:466]]
+
+    def step(region):
+        preprocessor.prepare(region)
+        count = len(preprocessor.read_landmarks(results))
+        preprocessor.mirror(count)
+
+    for region in regions:  # warm up: one buffer per output size
+        step(region)
+
+    frames = 3000
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for i in range(frames):
+        step(regions[i % len(regions)])
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{elapsed / frames * 1e6:.1f} us/frame")
+    print(f"retained: {current - before} B, peak transient: {peak - before} B "
+          f"(one input frame is {preprocessor.input_size ** 2 * 3} B)")
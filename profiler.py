@@ -0,0 +1,158 @@
+from collections import deque
+import json
+import time
+
+import numpy as np
+import pygame
+
+# Phases of a game frame, in execution order (see Game.run)
+PHASES = ('events', 'player', 'level', 'camera', 'score',  # update
+          'draw', 'hud', 'profiler', 'display', 'tick')  # render
+WORK_PHASES = len(PHASES) - 1  # everything but the clock.tick wait
+
+
+class NullProfiler:
+    " Stand-in for FrameProfiler when profiling is off: does nothing."
+
+    def begin_frame(self) -> None:
+        pass
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def draw(self, surface: pygame.Surface) -> None:
+        return None
+
+    def save(self, path: str) -> None:
+        pass
+
+
+class FrameProfiler:
+    """
+    A class to represent a per phase frame profiler.
+
+    Times every phase of the game frames (see PHASES) in a preallocated ring
+    of the last `capacity` frames, and the gesture worker inferences.
+    Exports a Chrome trace (chrome://tracing, ui.perfetto.dev) and can draw
+    a small frame time graph on screen.
+    """
+
+    def __init__(self, capacity: int = 36000, gestures=None, budget: float = 1 / 60):
+        """
+        :param capacity int: number of frames kept (oldest are overwritten).
+        :param gestures: GestureInput whose inferences are traced too.
+        :param budget float: frame duration (s) to draw on the graph.
+        """
+        self.capacity = capacity
+        self.gestures = gestures
+        self.budget = budget
+        self.frames = 0
+        self.starts = np.zeros(capacity)  # frame start times (s)
+        self.durations = np.zeros((capacity, len(PHASES)))  # (s)
+        self.inferences = deque(maxlen=capacity)  # (start, duration, capture time) (s)
+        self.__phase = {name: i for i, name in enumerate(PHASES)}
+        self.__row = self.durations[0]
+        self.__last = 0.
+
+    def begin_frame(self) -> None:
+        " Starts timing a new frame (the previous one is complete)."
+        if self.gestures:
+            self._poll_gestures()
+        self.__row = self.durations[self.frames % self.capacity]
+        self.__row[:] = 0
+        self.__last = self.starts[self.frames % self.capacity] = time.perf_counter()
+        self.frames += 1
+
+    def mark(self, phase: str) -> None:
+        """ Ends a phase: time since the previous mark is counted for it.
+        :param phase str: one of PHASES.
+        """
+        now = time.perf_counter()
+        self.__row[self.__phase[phase]] += now - self.__last
+        self.__last = now
+
+    def _poll_gestures(self) -> None:
+        " Keeps the inferences finished since last frame (never waits)."
+        span = self.gestures.inference_span
+        if span[0] and (not self.inferences or self.inferences[-1][0] != span[0]):
+            self.inferences.append(span)
+
+    def recent(self, frames: int) -> np.ndarray:
+        """ Phase durations of the last complete frames, oldest first.
+        :return np.ndarray: (frames, len(PHASES)) durations (s).
+        """
+        end = self.frames - 1  # (current frame is not complete)
+        indices = np.arange(max(end - frames, 0), end) % self.capacity
+        return self.durations[indices]
+
+    def draw(self, surface: pygame.Surface, pos: tuple = (10, 50),
+             size: tuple = (240, 60)) -> pygame.Rect:
+        """ Draws the frame times of the last frames: work (green, red over
+        budget) with the clock wait on top (gray), budget as a line.
+        :param surface pygame.Surface: the surface to draw on.
+        :return pygame.Rect: the region drawn.
+        """
+        x, y = pos
+        width, height = size
+        recent = self.recent(width // 2)
+        scale = height / (2 * self.budget)  # graph top: twice the budget
+        bottom = y + height
+        pygame.draw.rect(surface, (0, 0, 0), (x, y, width, height))
+        works = recent[:, :WORK_PHASES].sum(1).tolist()
+        waits = recent[:, WORK_PHASES].tolist()
+        for i, (work, wait) in enumerate(zip(works, waits)):
+            top = bottom - min(work * scale, height)
+            column = x + 2 * i
+            color = (220, 40, 40) if work > self.budget else (60, 200, 60)
+            pygame.draw.line(surface, color, (column, bottom), (column, top), 2)
+            wait = min(wait * scale, top - y)
+            if wait > 0:
+                pygame.draw.line(surface, (110, 110, 110), (column, top), (column, top - wait), 2)
+        budget_y = bottom - self.budget * scale
+        pygame.draw.line(surface, (255, 255, 255), (x, budget_y), (x + width, budget_y))
+        return pygame.Rect(x, y, width, height)
+
+    def summary(self) -> dict:
+        " Mean and 95th percentile (ms) of each phase over the kept frames."
+        durations = self.recent(self.capacity) * 1e3
+        if not len(durations):
+            return {}
+        return {name: (durations[:, i].mean(), np.percentile(durations[:, i], 95))
+                for i, name in enumerate(PHASES)}
+
+    def trace_events(self) -> list:
+        " Kept frames and inferences as Chrome trace events (µs)."
+        events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'game'}},
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 2,
+             'args': {'name': 'gesture-inference'}},
+        ]
+        end = self.frames - 1
+        for frame in range(max(end - self.capacity, 0), end):
+            i = frame % self.capacity
+            ts = self.starts[i] * 1e6
+            total = self.durations[i].sum() * 1e6
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': round(ts, 1), 'dur': round(total, 1), 'args': {'n': frame}})
+            for name, duration in zip(PHASES, self.durations[i] * 1e6):
+                if duration:
+                    events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                                   'ts': round(ts, 1), 'dur': round(duration, 1)})
+                    ts += duration
+        for start, duration, captured in self.inferences:
+            events.append({'name': 'hands.process', 'ph': 'X', 'pid': 1, 'tid': 2,
+                           'ts': round(start * 1e6, 1), 'dur': round(duration * 1e6, 1),
+                           'args': {'frame_age_ms': round((start - captured) * 1e3, 2)}})
+        return events
+
+    def save(self, path: str) -> None:
+        """ Writes the Chrome trace and prints a summary.
+        :param path str: trace file (.json).
+        """
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'},
+                      file, separators=(',', ':'))
+        print(f"Frame trace: {path} ({min(self.frames, self.capacity)} frames, "
+              f"{len(self.inferences)} inferences)")
+        for name, (mean, p95) in self.summary().items():
+            print(f"{name:>10}: {mean:7.3f} ms mean {p95:7.3f} ms p95")
@@ -0,0 +1,143 @@
+import numpy as np
+
+from features import HAND_LANDMARKS, count_fingers_batch
+
+MAGIC = b'DJLMREC2'
+HEADER_SIZE = 64
+MAX_HANDS = 2
+FACE_POINTS = 4  # eye corners (see head_tilt.EYE_CORNERS)
+
+# One fixed size record per analysed frame.
+# Hand landmarks are normalized to the processed region and mirrored
+# (selfie frame, like the finger counting sees them): the region and the
+# frame size map them back to the frame (see frame_landmarks).
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),  # seconds (time.perf_counter clock)
+    ('frame', '<u4'),
+    ('region', '<u2', (4,)),  # x, y, width, height in frame pixels (not mirrored)
+    ('frame_size', '<u2', (2,)),  # width, height
+    ('hands', 'u1'),  # number of valid hands
+    ('face', 'u1'),  # 1 if face landmarks are valid
+    ('finger_count', 'i1'),
+    ('handedness', 'i1', (MAX_HANDS,)),  # features.LEFT / RIGHT
+    ('hand_landmarks', '<f4', (MAX_HANDS, HAND_LANDMARKS, 3)),
+    ('face_landmarks', '<f4', (FACE_POINTS, 3)),
+], align=True)
+
+
+class LandmarkRecorder:
+    """
+    A class to represent a landmark recorder.
+
+    Appends fixed size records (RECORD_DTYPE) to a binary file,
+    buffered in a preallocated structured array.
+    Read it back with open_recording().
+    """
+
+    def __init__(self, path: str, buffer_size: int = 256):
+        self.path = path
+        self.__file = open(path, 'wb')
+        header = MAGIC + np.array([RECORD_DTYPE.itemsize, MAX_HANDS], '<u4').tobytes()
+        self.__file.write(header.ljust(HEADER_SIZE, b'\0'))
+        self.__buffer = np.zeros(buffer_size, RECORD_DTYPE)
+        self.__count = 0
+        self.frames = 0
+
+    def record(self, timestamp: float, region: tuple, frame_shape: tuple,
+               landmarks: np.ndarray, handedness: np.ndarray,
+               finger_count: int, face: np.ndarray = None) -> None:
+        """ Adds a frame record.
+        :param timestamp float: time of the frame (s).
+        :param region tuple: (x0, y0, x1, y1) processed region in frame pixels.
+        :param frame_shape tuple: shape of the full frame.
+        :param landmarks np.ndarray: (hands, 21, 3) hand landmarks.
+        :param handedness np.ndarray: (hands,) labels.
+        :param finger_count int: finger count derived for this frame.
+        :param face np.ndarray: (4, 3) eye corners or None.
+        """
+        record = self.__buffer[self.__count]
+        hands = min(len(landmarks), MAX_HANDS)
+        record['timestamp'] = timestamp
+        record['frame'] = self.frames
+        x0, y0, x1, y1 = region
+        record['region'] = x0, y0, x1 - x0, y1 - y0
+        record['frame_size'] = frame_shape[1], frame_shape[0]
+        record['hands'] = hands
+        record['finger_count'] = finger_count
+        record['handedness'][:hands] = handedness[:hands]
+        record['hand_landmarks'][:hands] = landmarks[:hands]
+        record['face'] = face is not None
+        if face is not None:
+            record['face_landmarks'] = face
+        self.frames += 1
+        self.__count += 1
+        if self.__count == len(self.__buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        " Writes buffered records to the file."
+        self.__buffer[:self.__count].tofile(self.__file)
+        self.__file.flush()
+        self.__buffer[:self.__count] = 0
+        self.__count = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.__file.close()
+
+
+def open_recording(path: str) -> np.memmap:
+    """ Maps a recording in memory (no parsing, no copy).
+    :return np.memmap: structured array of RECORD_DTYPE records.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER_SIZE)
+    assert header[:len(MAGIC)] == MAGIC, "Not a landmark recording !"
+    itemsize, max_hands = np.frombuffer(header[8:16], '<u4')
+    assert itemsize == RECORD_DTYPE.itemsize and max_hands == MAX_HANDS, \
+        "Recording made with another record format !"
+    return np.memmap(path, RECORD_DTYPE, 'r', offset=HEADER_SIZE)
+
+
+def frame_landmarks(records: np.ndarray) -> np.ndarray:
+    """ Hand landmarks normalized to the whole (mirrored) frame instead of
+    the processed region, z unchanged.
+    :param records np.ndarray: records from open_recording().
+    :return np.ndarray: (frames, MAX_HANDS, 21, 3) landmarks.
+    """
+    landmarks = np.array(records['hand_landmarks'])
+    region = records['region'].astype(np.float32)[:, None, None, :]
+    size = records['frame_size'].astype(np.float32)[:, None, None, :]
+    x, y = landmarks[..., 0], landmarks[..., 1]
+    # (x is mirrored in the region, the region is in the non mirrored frame)
+    x[:] = 1 - (region[..., 0] + (1 - x) * region[..., 2]) / size[..., 0]
+    y[:] = (region[..., 1] + y * region[..., 3]) / size[..., 1]
+    return landmarks
+
+
+def replay_finger_counts(records: np.ndarray) -> np.ndarray:
+    """ Runs the finger counting again over recorded frames (vectorized),
+    on the region landmarks like the live counting.
+    :param records np.ndarray: records from open_recording().
+    :return np.ndarray: (frames,) finger counts.
+    """
+    return count_fingers_batch(records['hand_landmarks'], records['handedness'],
+                               records['hands'])
+
+
+if __name__ == "__main__":
+    # python recording.py session.lmrec: checks and summarizes a recording
+    import sys
+    import time
+
+    records = open_recording(sys.argv[1])
+    start = time.perf_counter()
+    counts = replay_finger_counts(records)
+    elapsed = time.perf_counter() - start
+    landmarks = int(records['hands'].sum()) * HAND_LANDMARKS
+    duration = records['timestamp'][-1] - records['timestamp'][0] if len(records) else 0
+    print(f"{len(records)} frames, {duration:.1f} s, {landmarks} hand landmarks, "
+          f"{int(records['face'].sum())} frames with face")
+    print(f"replayed in {elapsed * 1e3:.1f} ms "
+          f"({landmarks / max(elapsed, 1e-9) / 1e6:.1f} M landmarks/s), "
+          f"{int((counts != records['finger_count']).sum())} mismatches")
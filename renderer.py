@@ -0,0 +1,75 @@
+from pygame import Surface, Rect
+
+
+class DirtyRenderer:
+    """
+    A class to represent a dirty rectangles renderer.
+
+    Used like the window surface by draw calls (blit), it keeps the regions
+    drawn each frame: next frame only those are restored from the cached
+    background, and only those are sent to pygame.display.update().
+    """
+
+    def __init__(self, window: Surface, background: Surface):
+        """
+        :param window pygame.Surface: the surface to draw on.
+        :param background pygame.Surface: static window sized background.
+        """
+        self.window = window
+        self.background = background
+        self.full_rect = window.get_rect()
+        self.__drawn = []  # regions drawn this frame
+        self.__dirty = []  # regions restored this frame
+        self.__full = True
+
+    def invalidate(self) -> None:
+        " Next frame is entirely redrawn (window content is unknown)."
+        self.__full = True
+
+    def begin(self) -> None:
+        " Restores the background under the last frame drawings."
+        if self.__full:
+            self.window.blit(self.background, (0, 0))
+        else:
+            for rect in self.__drawn:
+                self.window.blit(self.background, rect, rect)
+        # (lists are swapped and reused: no allocation)
+        self.__dirty, self.__drawn = self.__drawn, self.__dirty
+        self.__drawn.clear()
+
+    def blit(self, source: Surface, dest, area=None, special_flags: int = 0) -> Rect:
+        " Like pygame.Surface.blit on the window, the drawn region is kept."
+        rect = self.window.blit(source, dest, area, special_flags)
+        if rect.width and rect.height:  # (not off screen)
+            self.__drawn.append(rect)
+        return rect
+
+    def blits(self, sequence) -> list:
+        """ Like pygame.Surface.blits on the window (one call for many
+        sprites), the drawn regions are kept.
+        :param sequence list: (source, dest) pairs.
+        """
+        rects = self.window.blits(sequence)
+        for rect in rects:
+            if rect.width and rect.height:  # (not off screen)
+                self.__drawn.append(rect)
+        return rects
+
+    def add(self, rect: Rect) -> None:
+        """ Keeps a region drawn directly on the window (pygame.draw...).
+        :param rect pygame.Rect: the region, None does nothing.
+        """
+        if rect:
+            self.__drawn.append(self.full_rect.clip(rect))
+
+    def end(self) -> list:
+        """ Regions changed this frame (restored or drawn).
+        :return list: rects for pygame.display.update (valid until next begin).
+        """
+        if self.__full:
+            self.__full = False
+            self.__dirty.clear()
+            self.__dirty.append(self.full_rect)
+            return self.__dirty
+        self.__dirty.extend(self.__drawn)
+        return self.__dirty
@@ -0,0 +1,78 @@
+import numpy as np
+import cv2
+
+
+class InferenceScheduler:
+    """
+    A class to represent the gesture inference scheduler.
+
+    Decides, for each captured frame, whether hands.process should run:
+    - nothing moved since the last frame (cheap thumbnail difference):
+      the last finger count is reused,
+    - something moved: runs as often as the game frame-time headroom allows
+      (between min_interval and max_interval),
+    - in any case runs at least every max_interval.
+    """
+
+    def __init__(self, frame_budget: float, min_interval: float = 1 / 30,
+                 max_interval: float = .5, motion_threshold: float = 3.,
+                 thumbnail: tuple = (32, 24)):
+        self.frame_budget = frame_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.motion = 0.
+        self.last_run = 0.
+        self.__average_interval = max_interval
+
+        # preallocated thumbnails (current / previous) and their difference
+        self.__small = np.zeros((thumbnail[1], thumbnail[0], 3), np.uint8)
+        self.__gray = np.zeros(thumbnail[::-1], np.uint8)
+        self.__previous = np.zeros(thumbnail[::-1], np.uint8)
+        self.__diff = np.zeros(thumbnail[::-1], np.uint8)
+
+    @property
+    def rate(self) -> float:
+        " Effective inference rate (runs/s)."
+        return 1 / self.__average_interval
+
+    def motion_score(self, frame: np.ndarray) -> float:
+        """ Mean absolute difference (0-255) with the previous frame thumbnail.
+        :param frame np.ndarray: BGR frame.
+        """
+        cv2.resize(frame, self.__gray.shape[::-1], dst=self.__small,
+                   interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.__small, cv2.COLOR_BGR2GRAY, dst=self.__gray)
+        cv2.absdiff(self.__gray, self.__previous, dst=self.__diff)
+        self.__gray, self.__previous = self.__previous, self.__gray
+        return float(self.__diff.mean())
+
+    def interval(self, frame_time: float) -> float:
+        """ Time between two inferences given the game frame time.
+        :param frame_time float: time (s) the game spends working per frame.
+        """
+        # full rate while the game uses less than half its frame budget
+        headroom = (self.frame_budget - frame_time) / self.frame_budget
+        headroom = min(max(headroom * 2, 0), 1)
+        return self.max_interval - (self.max_interval - self.min_interval) * headroom
+
+    def should_run(self, frame: np.ndarray, now: float, frame_time: float) -> bool:
+        """ Called for each new frame.
+        :param frame np.ndarray: BGR frame.
+        :param now float: current time (s).
+        :param frame_time float: time (s) the game spends working per frame.
+        """
+        self.motion = self.motion_score(frame)
+        elapsed = now - self.last_run
+        if elapsed >= self.max_interval:
+            return True
+        if self.motion < self.motion_threshold:
+            return False
+        return elapsed >= self.interval(frame_time)
+
+    def ran(self, now: float) -> None:
+        " Called after each inference to measure the effective rate."
+        if self.last_run:
+            elapsed = min(now - self.last_run, self.max_interval)
+            self.__average_interval += (elapsed - self.__average_interval) * .1
+        self.last_run = now
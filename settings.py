@@ -1,9 +1,11 @@
 from pygame.font import SysFont
-from pygame import init
-from pygame import mixer
 import pygame
 
-init()
+from assets import load_assets
+import startup
+
+# (no side effect at import: pygame, the window, fonts and assets are
+# initialized on first use, see init_display() and __getattr__ below)
 # ==================================
 
 # Window Settings
@@ -12,6 +14,8 @@ HALF_XWIN, HALF_YWIN = XWIN / 2, YWIN / 2  # Center
 DISPLAY = (XWIN, YWIN)
 FLAGS = 0  # Fullscreen, resizeable...
 FPS = 60  # Render frame rate
+PHYSICS_RATE = 60  # Simulation steps per second (game speed, whatever the FPS)
+MAX_PHYSICS_STEPS = 5  # Steps caught up per frame at most (slower: the game slows down)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -30,41 +34,128 @@ PLAYER_JUMPFORCE = 17
 PLAYER_BONUS_JUMPFORCE = 50
 GRAVITY = .5
 
+# Gesture input (see gesture.py)
+CAMERA_INDEX = 0
+FRAME_SOURCE = CAMERA_INDEX  # Camera index, video file path or "synthetic"
+CAMERA_RESOLUTIONS = ((640, 480), (480, 360), (320, 240))  # (w, h) best first
+CAMERA_RING_SLOTS = 3  # Frames shared between capture and inference processes
+GESTURE_RESULT_MAX_AGE = .5  # Seconds before a finger count is ignored
+GESTURE_LATENCY_BUDGET = .02  # Seconds per hands.process call (picks capture resolution)
+HAND_ROI_SIZE = 256  # Hand region is downscaled to this size (px) before inference
+HAND_ROI_MAX_MISSES = 5  # Frames without hands before scanning the full frame
+GESTURE_MIN_INTERVAL = 1 / 30  # Seconds between inferences when moving (max rate)
+GESTURE_MAX_INTERVAL = .5  # Inference runs at least this often, even if still
+GESTURE_MOTION_THRESHOLD = 3.  # Mean frame difference (0-255) considered as motion
+# "model": MediaPipe on every scheduled frame
+# "tiered": a cheap open palm pre-detector runs on every frame and MediaPipe
+#           only confirms its candidates (for CPU-starved machines)
+GESTURE_DETECTION = "model"
+LANDMARK_RECORD_PATH = None  # Records hand/face landmarks to this file (recording.py)
+
+# Steering: "keyboard" (arrows) or "head_tilt" (webcam, arrows still work)
+STEERING_INPUT = "keyboard"
+HEAD_TILT_ANGLE = 12  # Head roll (deg) to start steering
+HEAD_TILT_RELEASE_ANGLE = 7  # Head roll (deg) under which steering stops
+FACE_ROI_SIZE = 192  # Face region is downscaled to this size (px)
+INPUT_WARMUP_TIMEOUT = 5000  # Max extra wait (ms) after countdown for camera inputs
+
+# Profiling (see profiler.py)
+PROFILE = False  # Times every frame phase, draws a frame time graph
+PROFILE_TRACE_PATH = "data/frame_trace.json"  # Chrome trace written on quit
+PROFILE_FRAMES = 36000  # Frames kept in the trace (last 10 minutes at 60 FPS)
+
+# Live metrics page, plain text (see metrics.py), off by default
+# e.g. METRICS_PORT = 8180: http://127.0.0.1:8180/metrics
+METRICS_HOST = "127.0.0.1"  # This machine only ("": every interface)
+METRICS_PORT = None  # None: no metrics server
+
+# Allocation diagnostics (see allocations.py), slows the game down
+ALLOCATION_TRACKING = False  # Reports allocations per frame by call site, growth
+ALLOCATION_INTERVAL = 600  # Frames between two measured frames
+
+# Startup (see startup.py)
+STARTUP_REPORT = False  # Prints where launch time went once the menu is shown
+
 # Platforms
 PLATFORM_COLOR = FOREST_GREEN
 PLATFORM_COLOR_LIGHT = BROWN
 PLATFORM_SIZE = (150, 10)
 PLATFORM_DISTANCE_GAP = (50, 150)
 MAX_PLATFORM_NUMBER = 15  # Chance is 1/n
+PLATFORM_POOL_SLACK = 5  # Spare pooled platforms (broken ones stay until off screen)
 BONUS_SPAWN_CHANCE = 5  # Chance is 1/n
 BONUS_SIZE = (40, 20)
 BREAKABLE_PLATFORM_CHANCE = 12
 
-# Fonts
-LARGE_FONT = SysFont("", 128)
-SMALL_FONT = SysFont("arial", 24)
-
-# Images
-backround = pygame.image.load('Images/backround_2.jpg')
-doodle = pygame.image.load('Images/doodle.png')
-doodle = pygame.transform.scale(doodle, PLAYER_SIZE)
-doodle_l = pygame.transform.flip(doodle, True, False)
-
-spring = pygame.image.load('Images/spring.png')
-spring = pygame.transform.scale(spring, BONUS_SIZE)
+# Fonts: system font name (None: pygame default font), size
+FONTS = {
+    'LARGE_FONT': (None, 128),
+    'SMALL_FONT': ("arial", 24),
+    'menu_font': (None, 40),
+    'countdown_font': (None, 100),
+}
 
+# Images: file, size to scale to (or None), mirrored
+IMAGES = {
+    'backround': ('Images/backround_2.jpg', None, False),
+    'doodle': ('Images/doodle.png', PLAYER_SIZE, False),
+    'doodle_l': ('Images/doodle.png', PLAYER_SIZE, True),
+    'spring': ('Images/spring.png', BONUS_SIZE, False),
+    'menu_background': ('Images/space_art.png', None, False),
+}
 # Sounds
-jump_sound = pygame.mixer.Sound("Images/jump_sound.mp3")
-break_sound = pygame.mixer.Sound("Images/breaking_sound.mp3")
-basic_sound = pygame.mixer.Sound("Images/basic_jumping.wav")
-death_sound = pygame.mixer.Sound("Images/death_sound.wav")
+SOUNDS = {
+    'jump_sound': "Images/jump_sound.mp3",
+    'break_sound': "Images/breaking_sound.mp3",
+    'basic_sound': "Images/basic_jumping.wav",
+    'death_sound': "Images/death_sound.wav",
+}
+# Scaled, decoded images and sounds (rebuilt when out of date, see assets.py)
+ASSET_BUNDLE = "data/assets.bundle"
 
 
 # Menu settings
-pygame.display.set_caption("Doodle Jump 2.0")
-menu_font = pygame.font.Font(None, 40)
-countdown_font = pygame.font.Font(None, 100)
 menu_items = [("Single Player", (HALF_XWIN - 100, HALF_YWIN - 50)),
               ("Multiplayer", (HALF_XWIN - 100, HALF_YWIN))]
-screen = pygame.display.set_mode((HALF_XWIN, HALF_YWIN))
-menu_background = pygame.image.load('Images/space_art.png')
+
+
+# ============= Resources =============
+
+def init_display(hidden: bool = False) -> pygame.Surface:
+    """ Initializes pygame and opens the (menu sized) window: settings.screen.
+    Must be called before images are used (they are in the display format).
+    :param hidden bool: no visible window (headless simulation, benchmarks).
+    """
+    global screen
+    with startup.step("display"):
+        pygame.init()
+        pygame.display.set_caption("Doodle Jump 2.0")
+        screen = pygame.display.set_mode((HALF_XWIN, HALF_YWIN),
+                                         pygame.HIDDEN if hidden else 0)
+    return screen
+
+
+def __getattr__(name: str):
+    """ Fonts (FONTS), images and sounds (IMAGES, SOUNDS) and the window
+    are only loaded when first used, then kept as module attributes:
+    settings.doodle loads every asset, settings.SMALL_FONT one font.
+    """
+    if name in FONTS:
+        family, size = FONTS[name]
+        with startup.step(f"font {name}"):
+            pygame.font.init()
+            # (SysFont looks up the installed fonts first: the default one is faster)
+            font = SysFont(family, size) if family else pygame.font.Font(None, size)
+        globals()[name] = font
+        return font
+    if name in IMAGES or name in SOUNDS:
+        if not pygame.display.get_surface():
+            init_display()
+        with startup.step("assets"):
+            assets = load_assets(ASSET_BUNDLE, IMAGES, SOUNDS)
+        for key, value in assets.items():
+            globals().setdefault(key, value)  # (sounds replaced before are kept)
+        return globals()[name]
+    if name == 'screen':
+        return init_display()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
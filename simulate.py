@@ -0,0 +1,39 @@
+import argparse
+import os
+import random
+
+# no window and no audio device needed (set before pygame is imported)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import Game
+import settings as config
+
+
+if __name__ == "__main__":
+    # ============= HEADLESS SIMULATION =============
+    # python simulate.py --minutes 60 : one hour of gameplay, as fast as possible
+    # (--seed makes the generated levels, hence the run, reproducible)
+    parser = argparse.ArgumentParser(description="Headless fixed-step game simulation")
+    parser.add_argument("--minutes", type=float, default=10,
+                        help="gameplay time to simulate")
+    parser.add_argument("--render", action="store_true",
+                        help="also render each frame to an off-screen surface")
+    parser.add_argument("--allocations", action="store_true",
+                        help="allocation diagnostics (see allocations.py)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed of the level generation")
+    parser.add_argument("--stall-seconds", type=float, default=10,
+                        help="gameplay time without progress that counts as a stall")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    config.ALLOCATION_TRACKING = config.ALLOCATION_TRACKING or args.allocations
+    game = Game(headless=True)
+    stats = game.simulate(int(args.minutes * 60 * config.PHYSICS_RATE), args.render,
+                          int(args.stall_seconds * config.PHYSICS_RATE))
+    game.allocations.stop()
+    for name, value in stats.items():
+        print(f"{name:>20}: {value:.6g}" if isinstance(value, float) else f"{name:>20}: {value}")
+    if stats['stalls']:
+        print(f"WARNING: the autopilot stalled {stats['stalls']} times")
@@ -1,27 +1,46 @@
 from pygame import Surface, Rect
 from camera import Camera
 
+# Solid color surfaces shared by every sprite: (width, height, color) -> Surface
+_solid_surfaces = {}
+
+
+def solid_surface(width: int, height: int, color: tuple) -> Surface:
+    """ Shared surface filled with a color, created on first use.
+    Must not be drawn on (every sprite of this size and color uses it).
+    """
+    key = (width, height, color)
+    surface = _solid_surfaces.get(key)
+    if surface is None:
+        surface = Surface((width, height))
+        surface.fill(color)
+        surface = _solid_surfaces[key] = surface.convert()
+    return surface
+
 
 class Sprite:
     """
     A class to represent a sprite.
 
     Used for pygame displaying.
-    Image generated with given color and size.
+    Image is a shared surface of the given color and size (see solid_surface),
+    created when first drawn: sprites using an image never build one.
+    Sprites have __slots__ (no instance dict): subclasses declare theirs.
     """
+    __slots__ = ('__color', '_image', 'rect', 'camera_rect')
 
     # default constructor (must be called if overriden by inheritance)
     def __init__(self, x: int, y: int, w: int, h: int, color: tuple):
         self.__color = color
-        self._image = Surface((w, h))
-        self._image.fill(self.color)
-        self._image = self._image.convert()
+        self._image = None  # (solid_surface on first use)
         self.rect = Rect(x, y, w, h)
         self.camera_rect = self.rect.copy()
 
     # Public getters for _image & __color so they remain private
     @property
     def image(self) -> Surface:
+        if self._image is None:
+            self._image = solid_surface(self.rect.width, self.rect.height, self.__color)
         return self._image
 
     @property
@@ -33,16 +52,15 @@ class Sprite:
         # Called when Sprite.__setattr__('color',x).
         assert isinstance(new, tuple) and len(new) == 3, "Value is not a color"
         self.__color = new
-        # update image surface
-        self._image.fill(self.color)
+        # update image surface (shared one of the new color, on next draw)
+        self._image = None
 
     def draw(self, surface: Surface) -> None:
         """ Render method,Should be called every frame after update.
         : param surface pygame.Surface: the surface to draw on.
         """
-        # If camera instanced: calculate render position
+        # If camera instanced: calculate render position (camera_rect)
         if Camera.instance:
-            self.camera_rect = Camera.instance.apply(self)
-            surface.blit(self._image, self.camera_rect)
+            surface.blit(self.image, Camera.instance.apply(self))
         else:
-            surface.blit(self._image, self.rect)
+            surface.blit(self.image, self.rect)
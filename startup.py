@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+import time
+
+# (first module imported by main.py: launch time is counted from here)
+ORIGIN = time.perf_counter()
+_steps = []  # (name, start, duration) in seconds, start relative to ORIGIN
+
+
+def record(name: str, start: float) -> None:
+    """ Records a startup step ending now.
+    :param name str: what the step did.
+    :param start float: time.perf_counter() when it began.
+    """
+    _steps.append((name, start - ORIGIN, time.perf_counter() - start))
+
+
+@contextmanager
+def step(name: str):
+    " Times a startup step: with step('fonts'): ..."
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, start)
+
+
+def report() -> str:
+    " Recorded steps by start time (steps can be nested in others)."
+    lines = [f"Startup: {(time.perf_counter() - ORIGIN) * 1e3:.0f} ms so far"]
+    lines += [f"  {start * 1e3:>7.1f} ms {duration * 1e3:>+8.1f} ms  {name}"
+              for name, start, duration in sorted(_steps, key=lambda s: s[1])]
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+import numpy as np
+
+
+class RegionTracker:
+    """
+    A class to represent the region-of-interest tracker (hands, face).
+
+    Uses the landmarks found on the previous frame to crop the next one
+    around them (a hand or a face only fills a small, slowly moving region).
+    The crop is then downscaled by the Preprocessor before inference.
+    Falls back to a full frame scan after max_misses frames without result.
+    """
+
+    def __init__(self, input_size: int = 256, max_misses: int = 5, margin: float = .35):
+        self.input_size = input_size
+        self.max_misses = max_misses
+        self.margin = margin
+        self.box = None  # (x0, y0, x1, y1) in full frame pixels
+        self.frame_size = None  # (height, width) of the frame the box is in
+        self.misses = 0
+
+    def reset(self) -> None:
+        " Forgets the region: next frame is scanned entirely."
+        self.box = None
+        self.frame_size = None
+        self.misses = 0
+
+    def crop(self, frame: np.ndarray) -> tuple:
+        """ Returns the region of the frame to run inference on.
+        :param frame np.ndarray: the full frame.
+        :return tuple: (image view, (x0, y0, x1, y1) region in the frame).
+        """
+        height, width = frame.shape[:2]
+        if self.box is not None and self.frame_size != (height, width):
+            # capture resolution changed: the box is in the old frame pixels
+            self.reset()
+        if self.box is None:
+            return frame, (0, 0, width, height)
+        x0, y0, x1, y1 = self.box
+        x0, x1 = min(max(x0, 0), width), min(max(x1, 0), width)
+        y0, y1 = min(max(y0, 0), height), min(max(y1, 0), height)
+        if x1 <= x0 or y1 <= y0:  # (nothing left in the frame)
+            self.reset()
+            return frame, (0, 0, width, height)
+        return frame[y0:y1, x0:x1], (x0, y0, x1, y1)
+
+    def update(self, landmarks: np.ndarray, region: tuple, frame_shape: tuple) -> None:
+        """ Computes the region for the next frame.
+        :param landmarks np.ndarray: (n, points, 2+) normalized to the region.
+        :param region tuple: the region returned by crop().
+        :param frame_shape tuple: shape of the full frame.
+        """
+        if not len(landmarks):
+            self.misses += 1
+            if self.misses >= self.max_misses:
+                self.box = None
+            return
+        self.misses = 0
+
+        # landmarks are normalized to the region: back to frame pixels
+        x0, y0, x1, y1 = region
+        xs, ys = landmarks[..., 0], landmarks[..., 1]
+        left, right = x0 + xs.min() * (x1 - x0), x0 + xs.max() * (x1 - x0)
+        top, bottom = y0 + ys.min() * (y1 - y0), y0 + ys.max() * (y1 - y0)
+
+        # square box around the landmarks (+margin) clamped to the frame
+        height, width = frame_shape[:2]
+        size = max(right - left, bottom - top) * (1 + 2 * self.margin)
+        size = min(max(size, self.input_size / 2), width, height)
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        bx = int(min(max(cx - size / 2, 0), width - size))
+        by = int(min(max(cy - size / 2, 0), height - size))
+        self.box = (bx, by, bx + int(size), by + int(size))
+        self.frame_size = (height, width)
+
+
+class ResolutionGovernor:
+    """
+    A class to represent the capture resolution governor.
+
+    Keeps a moving average of the hands.process latency (the model call
+    only: scheduling, pre-detection and region preparation are not counted)
+    and picks the largest capture resolution that fits its budget.
+    The chosen index is shared with the capture process.
+    """
+
+    def __init__(self, resolutions: tuple, budget: float, shared_index,
+                 smoothing: float = .1, patience: int = 60):
+        self.resolutions = resolutions
+        self.budget = budget
+        self.shared_index = shared_index
+        self.smoothing = smoothing
+        self.patience = patience
+        self.average = None
+        self.__fast_samples = 0
+
+    @property
+    def index(self) -> int:
+        return self.shared_index.value
+
+    def observe(self, latency: float) -> None:
+        """ Called after each inference.
+        :param latency float: duration of the hands.process call (s).
+        """
+        if self.average is None:
+            self.average = latency
+        else:
+            self.average += (latency - self.average) * self.smoothing
+
+        index = self.index
+        if self.average > self.budget and index < len(self.resolutions) - 1:
+            self._select(index + 1)  # too slow: lower resolution
+        elif self.average < self.budget / 2 and index > 0:
+            # comfortably fast for a while: try a higher resolution
+            self.__fast_samples += 1
+            if self.__fast_samples >= self.patience:
+                self._select(index - 1)
+        else:
+            self.__fast_samples = 0
+
+    def _select(self, index: int) -> None:
+        self.shared_index.value = index
+        self.average = None
+        self.__fast_samples = 0